@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import os
+from settings import *
+
+# Maps logical asset IDs ("sproto:GPM", "bg:results", ...) to the content hash of the file
+# behind them. The index remembers each file's mtime and size, so a launch is one directory
+# scan per asset folder and only new or touched files are re-hashed. Loaders key their
+# caches by hash, which makes byte-identical files decode once and share one surface.
+
+def default_assets():
+    assets = {f"sproto:{name}": os.path.join(SPROTO_IMAGE_PATH, filename) for name, filename in SPROTO_ROSTER}
+    assets["bg:selection"] = SELECTION_BG_PATH
+    assets["bg:results"] = RACE_BG_PATHS["results"]
+    for key in ("single_options", "tournament"):
+        for i, path in enumerate(RACE_BG_PATHS[key]):
+            assets[f"bg:{key}:{i}"] = path
+    assets["trophy"] = TROPHY_PATH
+    return assets
+
+def _file_hash(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _normalize(path):
+    return os.path.normcase(os.path.abspath(path))
+
+def _relative(path):
+    return os.path.relpath(os.path.abspath(path), BASE_DIR).replace(os.sep, "/")
+
+class AssetRegistry:
+    def __init__(self, assets, index_path=ASSET_INDEX_PATH):
+        self.assets = dict(assets)
+        self.index_path = index_path
+        self._hashes = None  # asset ID -> content hash, None for missing files
+        self._path_hashes = {}
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _save_index(self, files):
+        index = {"assets": self._hashes, "files": files}
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(self.index_path + ".tmp", "w") as f:
+                json.dump(index, f, indent=1, sort_keys=True)
+            os.replace(self.index_path + ".tmp", self.index_path)
+        except OSError as e:
+            logging.warning(f"Could not write asset index '{self.index_path}': {e}")
+
+    def _scan_directories(self):
+        stamps = {}
+        for folder in sorted({os.path.dirname(_normalize(path)) for path in self.assets.values()}):
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            stamps[_normalize(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError as e:
+                logging.error(f"Could not scan asset folder '{folder}': {e}")
+        return stamps
+
+    def scan(self):
+        known = self._load_index()
+        stamps = self._scan_directories()
+        files = {}
+        self._hashes = {}
+        self._path_hashes = {}
+        for asset_id, path in self.assets.items():
+            stamp = stamps.get(_normalize(path))
+            if stamp is None:
+                self._hashes[asset_id] = None
+                continue
+            name = _relative(path)
+            entry = known.get(name)
+            if entry is None or (entry.get("mtime"), entry.get("size")) != stamp:
+                try:
+                    entry = {"mtime": stamp[0], "size": stamp[1], "hash": _file_hash(path)}
+                except OSError as e:
+                    logging.error(f"Could not read asset '{path}': {e}")
+                    self._hashes[asset_id] = None
+                    continue
+            files[name] = entry
+            self._hashes[asset_id] = entry["hash"]
+            self._path_hashes[_normalize(path)] = entry["hash"]
+        if files != known:
+            self._save_index(files)
+        unique = len(set(self._path_hashes.values()))
+        logging.info(f"Asset registry: {len(self.assets)} assets, {len(files)} files, {unique} unique blobs")
+
+    def _ensure_scanned(self):
+        if self._hashes is None:
+            self.scan()
+
+    def path(self, asset_id):
+        return self.assets[asset_id]
+
+    def hash(self, asset_id):
+        self._ensure_scanned()
+        return self._hashes.get(asset_id)
+
+    def exists(self, asset_id):
+        return self.hash(asset_id) is not None
+
+    def missing(self, prefix=""):
+        self._ensure_scanned()
+        return [asset_id for asset_id, source_hash in self._hashes.items() if source_hash is None and asset_id.startswith(prefix)]
+
+    def content_key(self, path):
+        # Cache key for any path: the content hash for registered files, the normalized path otherwise
+        self._ensure_scanned()
+        key = _normalize(path)
+        return self._path_hashes.get(key, key)
+
+registry = AssetRegistry(default_assets())
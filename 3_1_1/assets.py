@@ -1,75 +1,222 @@
 import pygame
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from settings import *
+from sprite_cache import decode_sprite, finish_sprite
+from asset_registry import registry
+from frame_scheduler import FrameScheduler
+from bg_pack import build_pack, open_background_pack, pack_sources
+from surface_format import convert_for_display
+from log_pipeline import setup_logging
 
 # Setup logging
-try:
-    log_dir = os.path.dirname(LOG_PATH)
-    if log_dir and not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        filename=LOG_PATH
-    )
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-    logging.getLogger().addHandler(console_handler)
-except (OSError, PermissionError) as e:
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
-    logging.error(f"Failed to setup file logging to '{LOG_PATH}': {e}. Using console logging.")
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-    logging.getLogger().addHandler(console_handler)
+setup_logging()
+
+_sproto_images = None
+_sprite_jobs = {}  # Source hash -> decode job on the asset loader's pool
+
+def request_sproto_images():
+    # Starts decoding (or, on a cold cache, baking) every racer sprite in the background;
+    # returns the jobs so the loading screen can count them
+    for name, filename in SPROTO_ROSTER:
+        asset_id = f"sproto:{name}"
+        source_hash = registry.hash(asset_id)
+        if source_hash is not None and source_hash not in _sprite_jobs:
+            _sprite_jobs[source_hash] = asset_loader.submit(decode_sprite, registry.path(asset_id), source_hash)
+    return list(_sprite_jobs.values())
 
 def load_sproto_images():
+    # Loaded once per run; Cheese Mode asks again every time it starts
+    global _sproto_images
+    if _sproto_images is None:
+        _sproto_images = _load_sproto_images()
+    return list(_sproto_images)
+
+def _load_sproto_images():
     sproto_images = []
     fallback_image = pygame.Surface((50, 50))
     fallback_image.fill(PURPLE)
     missing_files = []
+    # Byte-identical racer images share one surface
+    loaded = {}
+    request_sproto_images()
 
-    if not os.path.exists(SPROTO_IMAGE_PATH):
-        logging.error(f"Directory '{SPROTO_IMAGE_PATH}' does not exist. Using fallback images.")
-        return [fallback_image] * len(sproto_names)
-    
-    logging.info(f"Files in {SPROTO_IMAGE_PATH}: {os.listdir(SPROTO_IMAGE_PATH)}")
-    
-    for idx, filename in enumerate(image_filenames):
-        file_path = os.path.join(SPROTO_IMAGE_PATH, filename)
-        logging.debug(f"Attempting to load {file_path} for Sproto '{sproto_names[idx]}'")
-        if not os.path.exists(file_path):
-            logging.warning(f"Image file '{filename}' not found for Sproto '{sproto_names[idx]}'. Using fallback image.")
+    for name, filename in SPROTO_ROSTER:
+        asset_id = f"sproto:{name}"
+        source_hash = registry.hash(asset_id)
+        if source_hash is None:
+            logging.warning(f"Image file '{filename}' not found for Sproto '{name}'. Using fallback image.")
             missing_files.append(filename)
             sproto_images.append(fallback_image)
+        elif source_hash in loaded:
+            logging.debug(f"Image '{filename}' for Sproto '{name}' duplicates an already loaded image")
+            sproto_images.append(loaded[source_hash])
         else:
             try:
-                image = pygame.image.load(file_path).convert_alpha()
-                image = pygame.transform.scale(image, (50, 50))
+                image = finish_sprite(_sprite_jobs[source_hash].result())
+                loaded[source_hash] = image
                 sproto_images.append(image)
-                logging.info(f"Loaded image '{filename}' for Sproto '{sproto_names[idx]}'")
-            except pygame.error as e:
-                logging.error(f"Error loading image '{filename}' for Sproto '{sproto_names[idx]}': {e}. Using fallback image.")
+                logging.info(f"Loaded image '{filename}' for Sproto '{name}'")
+            except (pygame.error, OSError) as e:
+                logging.error(f"Error loading image '{filename}' for Sproto '{name}': {e}. Using fallback image.")
                 missing_files.append(filename)
                 sproto_images.append(fallback_image)
 
     if missing_files:
         logging.error(f"Missing image files: {', '.join(missing_files)}")
 
-    if len(sproto_images) != len(sproto_names):
-        logging.error(f"Mismatch: {len(sproto_images)} images loaded but {len(sproto_names)} Sprotos defined. Adjusting with fallbacks.")
-        if len(sproto_images) < len(sproto_names):
-            sproto_images.extend([fallback_image] * (len(sproto_names) - len(sproto_images)))
-        else:
-            sproto_images = sproto_images[:len(sproto_names)]
-    
     return sproto_images
 
+class AssetLoader:
+    # Decodes image files on a thread pool, one job per unique path; backgrounds are also
+    # scaled to the screen there, once. Decoding doesn't touch the display, but conversion
+    # must run on the main thread, so that happens in surface() the first time an asset is
+    # actually used, in whichever format its alpha channel calls for. Backgrounds found in
+    # the pre-decoded pack skip all of that and are mapped straight from disk.
+    def __init__(self, workers=ASSET_LOADER_THREADS):
+        self.workers = workers
+        self._executor = None
+        self._decoded = {}
+        self._surfaces = {}
+        self._pack = None
+        self._pack_checked = False
+        self._backgrounds = {os.path.normcase(os.path.abspath(path)) for path in pack_sources()}
+
+    def _key(self, path):
+        # Content hash where known, so files with identical bytes decode once and share a surface
+        return registry.content_key(path)
+
+    def _start(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="assets")
+        if USE_BG_PACK and not self._pack_checked:
+            self._pack_checked = True
+            sources = pack_sources()
+            self._pack = open_background_pack(sources)
+            if self._pack is None:
+                # PNGs this run; the rebuilt pack is picked up on the next launch
+                self._executor.submit(self._rebuild_pack, sources)
+
+    def _rebuild_pack(self, sources):
+        try:
+            build_pack(sources)
+        except (OSError, pygame.error) as e:
+            logging.warning(f"Could not build background pack: {e}")
+
+    def _decode(self, path):
+        image = pygame.image.load(path)
+        if os.path.normcase(os.path.abspath(path)) in self._backgrounds and image.get_size() != (SCREEN_WIDTH, SCREEN_HEIGHT):
+            image = pygame.transform.scale(image, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        return image
+
+    def _packed(self, path):
+        return self._pack is not None and path in self._pack
+
+    def request(self, paths):
+        self._start()
+        for path in paths:
+            key = self._key(path)
+            if key not in self._decoded and not self._packed(path):
+                self._decoded[key] = self._executor.submit(self._decode, path)
+
+    def submit(self, fn, *args):
+        # Other display-free decode work (racer sprites) on the same pool
+        self._start()
+        return self._executor.submit(fn, *args)
+
+    def progress(self, paths):
+        self._start()
+        paths = {self._key(path): path for path in paths}
+        done = sum(1 for key, path in paths.items() if self._packed(path) or (key in self._decoded and self._decoded[key].done()))
+        return done, len(paths)
+
+    def surface(self, path):
+        key = self._key(path)
+        if key not in self._surfaces:
+            self.request([path])
+            try:
+                if self._packed(path):
+                    # Pack pixels already are in display format: use the mapping as-is
+                    self._surfaces[key] = self._pack.surface(path)
+                else:
+                    self._surfaces[key] = convert_for_display(self._decoded[key].result())
+            except Exception as e:
+                logging.error(f"Failed to load image '{path}': {e}")
+                self._surfaces[key] = None
+        return self._surfaces[key]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+asset_loader = AssetLoader()
+
+class LazySurfaceList:
+    # Sequence of images that are only converted when an item is first read
+    def __init__(self, loader, paths):
+        self.loader = loader
+        self.paths = list(paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.loader.surface(path) for path in self.paths[index]]
+        return self.loader.surface(self.paths[index])
+
+    def __iter__(self):
+        for path in self.paths:
+            yield self.loader.surface(path)
+
+class RaceBackgrounds:
+    # Same keys as the old race_backgrounds dict, but nothing is decoded until it is used.
+    # Tournament and single-race lists share BG paths, so each file is decoded only once.
+    def __init__(self, loader):
+        self.loader = loader
+        self.single_options = LazySurfaceList(loader, RACE_BG_PATHS["single_options"])
+        self.tournament = LazySurfaceList(loader, RACE_BG_PATHS["tournament"])
+
+    def __contains__(self, key):
+        return key in RACE_BG_PATHS
+
+    def __getitem__(self, key):
+        if key == "results":
+            return self.loader.surface(RACE_BG_PATHS["results"])
+        return getattr(self, key)
+
+    def prefetch(self, keys):
+        for key in keys:
+            paths = RACE_BG_PATHS[key]
+            self.loader.request(paths if isinstance(paths, list) else [paths])
+
+def show_loading_screen(screen, loader, paths, jobs=()):
+    # Progress bar while the assets for the first screen, and any other submitted jobs,
+    # decode in the background
+    loader.request(paths)
+    frames = FrameScheduler(30)
+    while True:
+        _, events = frames.next_frame(animating=True)
+        done, total = loader.progress(paths)
+        done += sum(1 for job in jobs if job.done())
+        total += len(jobs)
+        for event in events:
+            if event.type == pygame.QUIT:
+                return False
+        screen.fill(BLACK)
+        text = font.render(f"Loading... {done}/{total}", True, WHITE)
+        screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT // 2 - 40))
+        bar_width = 400
+        pygame.draw.rect(screen, WHITE, (SCREEN_WIDTH // 2 - bar_width // 2, SCREEN_HEIGHT // 2, bar_width, 20), 2)
+        pygame.draw.rect(screen, WHITE, (SCREEN_WIDTH // 2 - bar_width // 2, SCREEN_HEIGHT // 2, bar_width * done // max(total, 1), 20))
+        pygame.display.flip()
+        if done == total:
+            return True
+
 def load_selection_background(screen):
-    if not os.path.exists(SELECTION_BG_PATH):
+    if not registry.exists("bg:selection"):
         logging.error(f"Background image '{SELECTION_BG_PATH}' not found. Using white background.")
         screen.fill(BLACK)
         error_text = font.render("Background image missing!", True, RED)
@@ -78,8 +225,9 @@ def load_selection_background(screen):
         pygame.time.wait(2000)
         return None
     try:
-        bg = pygame.image.load(SELECTION_BG_PATH).convert()
-        bg = pygame.transform.scale(bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        bg = asset_loader.surface(SELECTION_BG_PATH)
+        if bg is None:
+            raise pygame.error("decode failed")
         logging.info(f"Loaded selection screen background: {SELECTION_BG_PATH}")
         return bg
     except Exception as e:
@@ -91,21 +239,17 @@ def load_selection_background(screen):
         pygame.time.wait(2000)
         return None
 
+_race_backgrounds = None
+
 def load_race_backgrounds():
-    try:
-        race_backgrounds = {
-            "single_options": [pygame.image.load(path).convert_alpha() for path in RACE_BG_PATHS["single_options"]],
-            "tournament": [pygame.image.load(path).convert_alpha() for path in RACE_BG_PATHS["tournament"]],
-            "results": pygame.image.load(RACE_BG_PATHS["results"]).convert_alpha()
-        }
-        return race_backgrounds, race_backgrounds["single_options"]
-    except Exception as e:
-        logging.error(f"Failed to load race backgrounds: {e}")
-        return {}, []
+    # Shared and lazy: each background is decoded on first use, at most once per run
+    global _race_backgrounds
+    if _race_backgrounds is None:
+        _race_backgrounds = RaceBackgrounds(asset_loader)
+    return _race_backgrounds, _race_backgrounds.single_options
 
 def load_trophy_image():
-    try:
-        return pygame.image.load(TROPHY_PATH).convert_alpha()
-    except Exception as e:
-        logging.error(f"Failed to load trophy image: {e}")
-        return None
\ No newline at end of file
+    trophy = asset_loader.surface(TROPHY_PATH)
+    if trophy is None:
+        logging.error("Failed to load trophy image")
+    return trophy
\ No newline at end of file
@@ -0,0 +1,229 @@
+import argparse
+import logging
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from settings import BATTLE_PROCESSES
+from rng import RandomStreams
+
+# Headless Pocket Sprotos rules: the same rolls, costs and effects as the fight screen in
+# run_pocket_sprotos_mode, with no drawing or timing. The screen rolls an action here,
+# animates it, then applies it; play_battle() does both back to back, so a whole fight
+# resolves in tens of microseconds and run_battle_batch() can play millions of them.
+MAX_HP = 100
+MAX_PP = 20
+MAX_AP = 3
+MAX_JUICE = 1
+BOLT_COST = 10
+HEAL = 25
+
+ATTACK = "Attack"
+MAGIC = "Magic"
+ABILITY = "Ability"
+ITEM = "Item"
+ACTIONS = (ATTACK, MAGIC, ABILITY, ITEM)
+
+# miss/dodge/crit describe an attack roll; stun is set by Sonic Dash
+ActionResult = namedtuple("ActionResult", "action actor target damage heal miss dodge crit stun")
+
+class BattleState:
+    __slots__ = ("hp", "pp", "ap", "juice", "stunned", "turn")
+
+    def __init__(self, first=0):
+        self.reset(first)
+
+    def reset(self, first=0):
+        # Lists are refilled in place, so the fight screen can keep aliases to them
+        for field, value in (("hp", MAX_HP), ("pp", MAX_PP), ("ap", MAX_AP), ("juice", MAX_JUICE), ("stunned", 0)):
+            if hasattr(self, field):
+                getattr(self, field)[:] = [value, value]
+            else:
+                setattr(self, field, [value, value])
+        self.turn = first
+
+    @property
+    def winner(self):
+        if self.hp[1] <= 0:
+            return 0
+        if self.hp[0] <= 0:
+            return 1
+        return None
+
+    def can_use(self, side, action):
+        if action == MAGIC:
+            return self.pp[side] >= BOLT_COST
+        if action == ABILITY:
+            return self.ap[side] > 0
+        if action == ITEM:
+            return self.juice[side] > 0
+        return True
+
+def skip_stunned_turn(state):
+    # A stunned side loses its turn; True if that just happened
+    if state.stunned[state.turn] > 0:
+        state.stunned[state.turn] -= 1
+        state.turn = 1 - state.turn
+        return True
+    return False
+
+def roll_action(state, action, rng):
+    # Rolls the outcome of the side to move using action, without changing the state.
+    # The draws happen in the same order the fight screen always made them.
+    actor = state.turn
+    target = 1 - actor
+    if action == ATTACK:
+        miss = rng.random() < 0.10
+        dodge = not miss and rng.random() < 0.10
+        crit = not miss and not dodge and rng.random() < 0.20
+        damage = rng.randint(8, 10)
+        if miss or dodge:
+            damage = 0
+        elif crit:
+            damage = int(damage * 2.5)
+        return ActionResult(action, actor, target, damage, 0, miss, dodge, crit, False)
+    if action == MAGIC:
+        return ActionResult(action, actor, target, rng.randint(33, 39), 0, False, False, False, False)
+    if action == ABILITY:
+        return ActionResult(action, actor, target, rng.randint(5, 10), 0, False, False, False, True)
+    if action == ITEM:
+        return ActionResult(action, actor, target, 0, HEAL, False, False, False, False)
+    raise ValueError(f"Unknown battle action '{action}'")
+
+def apply_action(state, result):
+    actor, target = result.actor, result.target
+    if result.action == MAGIC:
+        state.pp[actor] -= BOLT_COST
+    elif result.action == ABILITY:
+        state.ap[actor] -= 1
+    elif result.action == ITEM:
+        state.juice[actor] -= 1
+        state.hp[actor] = min(MAX_HP, state.hp[actor] + result.heal)
+    if result.damage:
+        state.hp[target] = max(0, state.hp[target] - result.damage)
+    if result.stun:
+        state.stunned[target] = 1  # Skips their next turn
+    state.turn = target
+
+# Policies pick an action for `side`; only legal actions are returned.
+
+def npc_policy(state, side, rng):
+    # The fight screen's NPC: likes Sonic Dash, bolts a healthy opponent, heals when low
+    opponent = 1 - side
+    can_magic = state.pp[side] >= BOLT_COST
+    can_item = state.juice[side] > 0 and state.hp[side] < MAX_HP
+    can_ability = state.ap[side] > 0
+    if can_ability and state.stunned[side] == 0 and rng.random() < 0.4:
+        return ABILITY
+    if can_magic and (state.hp[opponent] > 35 or rng.random() < 0.4):
+        return MAGIC
+    if can_item and state.hp[side] <= MAX_HP * 0.5 and rng.random() < 0.5:
+        return ITEM
+    return ATTACK
+
+def attack_policy(state, side, rng):
+    return ATTACK
+
+def aggressive_policy(state, side, rng):
+    # Biggest hit first: bolt, then dash, then attack
+    if state.pp[side] >= BOLT_COST:
+        return MAGIC
+    if state.ap[side] > 0:
+        return ABILITY
+    return ATTACK
+
+def random_policy(state, side, rng):
+    choices = [action for action in ACTIONS if state.can_use(side, action) and (action != ITEM or state.hp[side] < MAX_HP)]
+    return choices[int(rng.random() * len(choices))]
+
+POLICIES = {
+    "npc": npc_policy,
+    "attack": attack_policy,
+    "aggressive": aggressive_policy,
+    "random": random_policy,
+}
+
+def play_battle(policy_a, policy_b, rng, state=None):
+    # Plays one fight from the starting position (random first mover, as in the game).
+    # Returns (winner side, actions taken).
+    if state is None:
+        state = BattleState()
+    state.reset(rng.choice([0, 1]))
+    policies = (policy_a, policy_b)
+    actions = 0
+    while state.winner is None:
+        if skip_stunned_turn(state):
+            continue
+        apply_action(state, roll_action(state, policies[state.turn](state, state.turn, rng), rng))
+        actions += 1
+    return state.winner, actions
+
+def _run_shard(policy_a, policy_b, fights, seed):
+    rng = RandomStreams(seed).python_random()
+    play_a, play_b = POLICIES[policy_a], POLICIES[policy_b]
+    state = BattleState()
+    wins = np.zeros(2, dtype=np.int64)
+    actions = 0
+    for _ in range(fights):
+        winner, taken = play_battle(play_a, play_b, rng, state)
+        wins[winner] += 1
+        actions += taken
+    return wins, actions
+
+class BattleReport:
+    def __init__(self, results):
+        self.results = results  # (policy_a, policy_b) -> [wins_a, wins_b, actions]
+        self.matchups = {}
+        for (policy_a, policy_b), (wins_a, wins_b, actions) in results.items():
+            fights = wins_a + wins_b
+            self.matchups[(policy_a, policy_b)] = (wins_a / fights, actions / fights, fights)
+        totals = {}
+        for (policy_a, policy_b), (wins_a, wins_b, _) in results.items():
+            for policy, wins in ((policy_a, wins_a), (policy_b, wins_b)):
+                won, played = totals.get(policy, (0, 0))
+                totals[policy] = (won + wins, played + wins_a + wins_b)
+        self.policies = {policy: won / played for policy, (won, played) in totals.items()}
+
+    def format(self):
+        lines = ["Policy win rates:"]
+        for policy, rate in sorted(self.policies.items(), key=lambda item: -item[1]):
+            lines.append(f"  {policy:<12} {rate:7.2%}")
+        lines.append("Matchups (win rate of the first policy):")
+        for (policy_a, policy_b), (rate, actions, fights) in sorted(self.matchups.items()):
+            lines.append(f"  {policy_a:>12} vs {policy_b:<12} {rate:7.2%}  {actions:5.1f} actions/fight  {fights} fights")
+        return "\n".join(lines)
+
+def _shard_sizes(fights, shard_size):
+    full, rest = divmod(fights, shard_size)
+    return [shard_size] * full + ([rest] if rest else [])
+
+def run_battle_batch(matchups=None, fights=100000, processes=BATTLE_PROCESSES, seed=None, shard_size=50000):
+    # Plays `fights` fights for every (policy_a, policy_b) pair across a process pool.
+    # Each shard draws from its own spawned substream, so a fixed seed is reproducible.
+    if matchups is None:
+        matchups = [(a, b) for a in POLICIES for b in POLICIES]
+    shards = [(matchup, size) for matchup in matchups for size in _shard_sizes(fights, shard_size)]
+    streams = RandomStreams(seed).spawn(len(shards))
+    results = {matchup: [0, 0, 0] for matchup in matchups}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            (matchup, executor.submit(_run_shard, matchup[0], matchup[1], size, stream.seed_sequence))
+            for (matchup, size), stream in zip(shards, streams)
+        ]
+        for matchup, future in futures:
+            wins, actions = future.result()
+            totals = results[matchup]
+            totals[0] += int(wins[0])
+            totals[1] += int(wins[1])
+            totals[2] += actions
+    logging.info(f"Battle batch: {len(matchups)} matchups x {fights} fights")
+    return BattleReport(results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Pocket Sprotos fights headlessly and report win rates.")
+    parser.add_argument("--fights", type=int, default=100000, help="fights per matchup")
+    parser.add_argument("--policies", nargs="+", choices=sorted(POLICIES), default=list(POLICIES))
+    parser.add_argument("--processes", type=int, default=BATTLE_PROCESSES)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    pairs = [(a, b) for a in args.policies for b in args.policies]
+    print(run_battle_batch(pairs, args.fights, processes=args.processes, seed=args.seed).format())
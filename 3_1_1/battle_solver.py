@@ -0,0 +1,237 @@
+import argparse
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from settings import *
+from battle_engine import (BattleState, MAX_HP, MAX_PP, MAX_AP, MAX_JUICE, BOLT_COST, HEAL,
+                           ATTACK, MAGIC, ABILITY, ITEM, POLICIES, play_battle)
+from rng import RandomStreams
+
+# Exact Pocket Sprotos odds. A state is seen from the side about to move and indexed
+# [juice, opponent juice, PP / BOLT_COST, opponent's, AP, opponent's, HP, opponent's HP].
+# A stunned side just loses its turn, so Sonic Dash is "damage, then move again" and the
+# stun never needs its own axis. Every move spends a resource or HP except a missed or
+# dodged attack, which hands the same position to the opponent; so the table is filled
+# juice level by juice level, in order of total HP, and the only cycle (both sides
+# whiffing) is solved per diagonal by fixed-point iteration.
+SOLVER_ACTIONS = (ATTACK, MAGIC, ABILITY, ITEM)
+
+# Outcome distributions, exactly as battle_engine.roll_action draws them
+ATTACK_OUTCOMES = [(0, 0.10 + 0.90 * 0.10)]
+ATTACK_OUTCOMES += [(damage, 0.90 * 0.90 * 0.80 / 3) for damage in (8, 9, 10)]
+ATTACK_OUTCOMES += [(int(damage * 2.5), 0.90 * 0.90 * 0.20 / 3) for damage in (8, 9, 10)]
+BOLT_OUTCOMES = [(damage, 1 / 7) for damage in range(33, 40)]
+DASH_OUTCOMES = [(damage, 1 / 6) for damage in range(5, 11)]
+
+def _rules_key():
+    rules = (MAX_HP, MAX_PP, MAX_AP, MAX_JUICE, BOLT_COST, HEAL, ATTACK_OUTCOMES, BOLT_OUTCOMES, DASH_OUTCOMES)
+    return hashlib.sha1(repr(rules).encode("utf-8")).hexdigest()[:12]
+
+def _table_paths(folder=SPRITE_CACHE_DIR):
+    key = _rules_key()
+    return os.path.join(folder, f"battle_odds_{key}.npy"), os.path.join(folder, f"battle_moves_{key}.npy")
+
+def _diagonal(total):
+    hp = np.arange(max(1, total - MAX_HP), min(MAX_HP, total - 1) + 1)
+    return hp, total - hp
+
+def _swapped(table):
+    # table[p, q, a, b, ...] seen from the other side: [q, p, b, a, ...]
+    return table.transpose(1, 0, 3, 2, 4, 5)
+
+def _action_values(odds, juice, opponent_juice, hp, opponent_hp):
+    # Win chances of each move except the whiffed attack, for every PP/AP combination on
+    # one diagonal. Shape (actions, PP, opponent PP, AP, opponent AP, len(hp)).
+    pp_levels, ap_levels = MAX_PP // BOLT_COST + 1, MAX_AP + 1
+    values = np.full((len(SOLVER_ACTIONS), pp_levels, pp_levels, ap_levels, ap_levels, len(hp)), -1.0)
+    # After a move the opponent is to play: their view is the swapped table
+    reply = _swapped(odds[opponent_juice, juice])
+    values[0] = 0.0
+    for damage, chance in ATTACK_OUTCOMES:
+        if damage:
+            values[0] += chance * (1.0 - reply[..., np.maximum(opponent_hp - damage, 0), hp])
+    bolt = np.zeros_like(values[1, 1:])
+    for damage, chance in BOLT_OUTCOMES:
+        bolt += chance * (1.0 - reply[:-1, ..., np.maximum(opponent_hp - damage, 0), hp])
+    values[1, 1:] = bolt
+    # Sonic Dash: the opponent's turn is skipped, so the mover plays on from its own view
+    again = odds[juice, opponent_juice][:, :, :-1]
+    dash = np.zeros_like(values[2, :, :, 1:])
+    for damage, chance in DASH_OUTCOMES:
+        dash += chance * again[..., hp, np.maximum(opponent_hp - damage, 0)]
+    values[2, :, :, 1:] = dash
+    if juice > 0:
+        healed = _swapped(odds[opponent_juice, juice - 1])
+        values[3] = 1.0 - healed[..., opponent_hp, np.minimum(hp + HEAL, MAX_HP)]
+    return values
+
+def solve_battle(tolerance=1e-13):
+    # Returns (odds, moves): the mover's win chance under best play by both sides, and
+    # the index into SOLVER_ACTIONS of the move that achieves it
+    pp_levels, ap_levels = MAX_PP // BOLT_COST + 1, MAX_AP + 1
+    shape = (MAX_JUICE + 1, MAX_JUICE + 1, pp_levels, pp_levels, ap_levels, ap_levels, MAX_HP + 1, MAX_HP + 1)
+    odds = np.zeros(shape)
+    odds[..., 1:, 0] = 1.0  # Opponent down: the mover has won. Mover down: lost (0).
+    moves = np.zeros(shape, dtype=np.int8)
+    whiff = ATTACK_OUTCOMES[0][1]
+    # Sides' juice pairs, lowest total first; (j, k) and (k, j) whiff into each other
+    levels = {}
+    for juice in range(MAX_JUICE + 1):
+        for opponent_juice in range(MAX_JUICE + 1):
+            levels.setdefault(juice + opponent_juice, []).append((juice, opponent_juice))
+    for level in sorted(levels):
+        pairs = levels[level]
+        for total in range(2, 2 * MAX_HP + 1):
+            hp, opponent_hp = _diagonal(total)
+            values = {pair: _action_values(odds, pair[0], pair[1], hp, opponent_hp) for pair in pairs}
+            best_other = {pair: values[pair][1:].max(axis=0) for pair in pairs}
+            for _ in range(200):
+                change = 0.0
+                for juice, opponent_juice in pairs:
+                    # A whiff gives the opponent this same position, from their side
+                    partner = _swapped(odds[opponent_juice, juice])[..., opponent_hp, hp]
+                    attack = values[(juice, opponent_juice)][0] + whiff * (1.0 - partner)
+                    best = np.maximum(attack, best_other[(juice, opponent_juice)])
+                    view = odds[juice, opponent_juice]
+                    change = max(change, float(np.abs(best - view[..., hp, opponent_hp]).max()))
+                    view[..., hp, opponent_hp] = best
+                if change < tolerance:
+                    break
+            for juice, opponent_juice in pairs:
+                partner = _swapped(odds[opponent_juice, juice])[..., opponent_hp, hp]
+                action_values = values[(juice, opponent_juice)]
+                action_values[0] += whiff * (1.0 - partner)
+                moves[juice, opponent_juice][..., hp, opponent_hp] = action_values.argmax(axis=0)
+    return odds, moves
+
+class BattleOdds:
+    def __init__(self, odds, moves):
+        self.odds = odds
+        self.moves = moves
+
+    def _mover_index(self, state):
+        # The side that actually moves next (a stunned side is skipped) and its table index
+        mover = state.turn
+        if state.stunned[mover] > 0:
+            mover = 1 - mover
+        other = 1 - mover
+        return mover, (state.juice[mover], state.juice[other], state.pp[mover] // BOLT_COST, state.pp[other] // BOLT_COST,
+                       state.ap[mover], state.ap[other], state.hp[mover], state.hp[other])
+
+    def win_chance(self, state, side):
+        winner = state.winner
+        if winner is not None:
+            return 1.0 if winner == side else 0.0
+        mover, index = self._mover_index(state)
+        chance = float(self.odds[index])
+        return chance if side == mover else 1.0 - chance
+
+    def best_action(self, state):
+        _, index = self._mover_index(state)
+        return SOLVER_ACTIONS[self.moves[index]]
+
+def _load_table(odds_path, moves_path):
+    try:
+        return BattleOdds(np.load(odds_path, mmap_mode="r"), np.load(moves_path, mmap_mode="r"))
+    except (OSError, ValueError):
+        return None
+
+def _solve_and_save(odds_path, moves_path):
+    # Runs in a worker process; the table comes back as float32 either way
+    odds, moves = solve_battle()
+    odds = odds.astype(np.float32)
+    try:
+        os.makedirs(os.path.dirname(odds_path), exist_ok=True)
+        np.save(odds_path, odds)
+        np.save(moves_path, moves)
+    except OSError as e:
+        logging.warning(f"Could not write battle odds table: {e}")
+    return odds, moves
+
+class BattleOddsService:
+    # The solved table, memory-mapped from the sprite cache. When it is missing (first run,
+    # or the rules changed) it is solved in a worker process, like odds_service, so the
+    # fight screen keeps running while it waits.
+    def __init__(self):
+        self.failed = False
+        self._odds = None
+        self._executor = None
+        self._future = None
+        self._started = 0.0
+
+    def _start(self):
+        self._executor = ProcessPoolExecutor(max_workers=1)
+        self._future = self._executor.submit(_solve_and_save, *_table_paths())
+        self._started = time.perf_counter()
+        logging.info("Solving Pocket Sprotos odds table in the background")
+
+    def _collect(self):
+        try:
+            odds, moves = self._future.result()
+            self._odds = BattleOdds(odds, moves)
+            logging.info(f"Pocket Sprotos odds table ready after {time.perf_counter() - self._started:.1f}s")
+        except Exception as e:
+            logging.error(f"Pocket Sprotos odds solve failed: {e}")
+            self.failed = True
+        self.shutdown()
+        return self._odds
+
+    def get(self):
+        # Non-blocking: the table, or None while it is being solved (or if solving failed)
+        if self._odds is not None or self.failed:
+            return self._odds
+        if self._future is None:
+            self._odds = _load_table(*_table_paths())
+            if self._odds is None:
+                try:
+                    self._start()
+                except Exception as e:
+                    logging.error(f"Failed to start Pocket Sprotos odds solve: {e}")
+                    self.failed = True
+            return self._odds
+        if self._future.done():
+            return self._collect()
+        return None
+
+    def compute(self):
+        # Blocking, for headless use: waits for a running solve, or solves in this process
+        if self._odds is not None:
+            return self._odds
+        if self._future is not None and self._collect() is not None:
+            return self._odds
+        self._odds = _load_table(*_table_paths())
+        if self._odds is None:
+            start = time.perf_counter()
+            self._odds = BattleOdds(*_solve_and_save(*_table_paths()))
+            logging.info(f"Solved Pocket Sprotos odds table in {time.perf_counter() - start:.1f}s")
+        return self._odds
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._future = None
+
+battle_odds_service = BattleOddsService()
+
+def optimal_policy(state, side, rng):
+    return battle_odds_service.compute().best_action(state)
+
+POLICIES["optimal"] = optimal_policy
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve Pocket Sprotos exactly and check the table against played fights.")
+    parser.add_argument("--fights", type=int, default=20000, help="fights per check")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    table = battle_odds_service.compute()
+    start = BattleState(0)
+    first = table.win_chance(start, 0)
+    print(f"Opening odds under best play: {first:.4%} for the side moving first")
+    rng = RandomStreams(args.seed).python_random()
+    for opponent in sorted(POLICIES):
+        wins = sum(play_battle(optimal_policy, POLICIES[opponent], rng)[0] == 0 for _ in range(args.fights))
+        print(f"  optimal vs {opponent:<12} {wins / args.fights:7.2%}")
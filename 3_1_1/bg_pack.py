@@ -0,0 +1,129 @@
+import logging
+import mmap
+import os
+import struct
+import pygame
+from settings import *
+from surface_format import alpha_usage
+
+# Full-screen backgrounds pre-decoded into one pack file of raw BGRA pixels at screen size.
+# BGRA is the layout convert_alpha() produces, so the mapped pages are wrapped as surfaces
+# with no copy and no conversion: loading a background costs page faults, not PNG inflation.
+# Layout: header, index of (path, mtime, size, offset, opaque), then page-aligned pixel buffers.
+PACK_MAGIC = b"SBGP"
+PACK_VERSION = 2
+HEADER = struct.Struct("<4sIIII")  # magic, version, count, width, height
+ENTRY = struct.Struct("<256sqqqI")  # path relative to BASE_DIR, source mtime_ns, source size, offset, opaque
+ALIGN = mmap.PAGESIZE
+
+def pack_sources():
+    paths = [SELECTION_BG_PATH]
+    for value in RACE_BG_PATHS.values():
+        paths.extend(value if isinstance(value, list) else [value])
+    return list(dict.fromkeys(paths))
+
+def _relative(path):
+    return os.path.relpath(os.path.abspath(path), BASE_DIR).replace(os.sep, "/")
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def build_pack(paths, pack_path=BG_PACK_PATH):
+    # Decodes every background once and writes the pack; missing or broken files are left out
+    frame_size = SCREEN_WIDTH * SCREEN_HEIGHT * 4
+    entries = []
+    buffers = []
+    slots = {}  # Identical images share one buffer
+    for path in paths:
+        try:
+            stamp = _source_stamp(path)
+            image = pygame.image.load(path)
+        except (OSError, pygame.error) as e:
+            logging.warning(f"Leaving '{path}' out of the background pack: {e}")
+            continue
+        if image.get_size() != (SCREEN_WIDTH, SCREEN_HEIGHT):
+            image = pygame.transform.scale(image, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        pixels = pygame.image.tobytes(image, "BGRA")
+        if pixels not in slots:
+            slots[pixels] = len(buffers)
+            buffers.append(pixels)
+        entries.append((_relative(path), *stamp, slots[pixels], alpha_usage(image) == "opaque"))
+    data_start = -(-(HEADER.size + ENTRY.size * len(entries)) // ALIGN) * ALIGN
+    stride = -(-frame_size // ALIGN) * ALIGN
+    os.makedirs(os.path.dirname(pack_path), exist_ok=True)
+    with open(pack_path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, len(entries), SCREEN_WIDTH, SCREEN_HEIGHT))
+        for name, mtime, size, slot, opaque in entries:
+            f.write(ENTRY.pack(name.encode("utf-8"), mtime, size, data_start + slot * stride, opaque))
+        for i, pixels in enumerate(buffers):
+            f.seek(data_start + i * stride)
+            f.write(pixels)
+        f.truncate(data_start + len(buffers) * stride)
+    os.replace(pack_path + ".tmp", pack_path)
+    logging.info(f"Wrote background pack '{pack_path}' with {len(entries)} images in {len(buffers)} buffers")
+
+class BackgroundPack:
+    def __init__(self, pack_path):
+        with open(pack_path, "rb") as f:
+            # Copy-on-write mapping: pages are shared with the file cache until something draws on them
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, count, width, height = HEADER.unpack_from(self._map, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self._map.close()
+            raise ValueError("not a background pack or an old version")
+        self.size = (width, height)
+        self._entries = {}
+        for i in range(count):
+            name, mtime, size, offset, opaque = ENTRY.unpack_from(self._map, HEADER.size + i * ENTRY.size)
+            self._entries[name.rstrip(b"\0").decode("utf-8")] = (mtime, size, offset, opaque)
+        self._surfaces = {}
+
+    def is_current(self, paths):
+        # Stale if a source was added, touched, or the screen size changed since the pack was built
+        if self.size != (SCREEN_WIDTH, SCREEN_HEIGHT):
+            return False
+        for path in paths:
+            try:
+                stamp = _source_stamp(path)
+            except OSError:
+                continue  # Missing files fall back to the PNG path, which reports them
+            entry = self._entries.get(_relative(path))
+            if entry is None or entry[:2] != stamp:
+                return False
+        return True
+
+    def __contains__(self, path):
+        return _relative(path) in self._entries
+
+    def surface(self, path):
+        name = _relative(path)
+        if name not in self._surfaces:
+            offset, opaque = self._entries[name][2:]
+            pixels = memoryview(self._map)[offset:offset + self.size[0] * self.size[1] * 4]
+            surface = pygame.image.frombuffer(pixels, self.size, "BGRA")
+            if opaque:
+                # Same pixels, but blitted as a straight copy instead of an alpha blend
+                surface.set_alpha(None)
+            self._surfaces[name] = surface
+        return self._surfaces[name]
+
+    def close(self):
+        # Only safe before any surface has been handed out
+        self._map.close()
+
+def open_background_pack(paths, pack_path=BG_PACK_PATH):
+    # The pack if it is present and up to date with every source, None to fall back to PNGs
+    try:
+        pack = BackgroundPack(pack_path)
+    except (OSError, ValueError, struct.error) as e:
+        logging.info(f"No usable background pack at '{pack_path}': {e}")
+        return None
+    if not pack.is_current(paths):
+        logging.info(f"Background pack '{pack_path}' is out of date")
+        pack.close()
+        return None
+    return pack
+
+if __name__ == "__main__":
+    build_pack(pack_sources())
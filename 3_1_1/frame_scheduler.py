@@ -0,0 +1,48 @@
+import pygame
+from settings import *
+
+# Shared frame pacing for every screen loop. Animated screens run at a capped frame rate;
+# static ones block in pygame.event.wait() until input arrives or a requested wake-up
+# is due, so a screen nobody touches costs next to no CPU between redraws.
+class FrameScheduler:
+    def __init__(self, fps=FRAME_RATE):
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.dirty = True  # The first frame is always drawn
+        self._wake_at = None
+
+    def invalidate(self):
+        self.dirty = True
+
+    def wake_in(self, ms):
+        # Redraw after ms even without input, e.g. while a result is still being computed
+        wake_at = pygame.time.get_ticks() + ms
+        if self._wake_at is None or wake_at < self._wake_at:
+            self._wake_at = wake_at
+
+    def next_frame(self, animating=False):
+        # Returns (seconds since the previous frame, events). Any event or due wake-up marks
+        # the frame dirty; an animating screen is always dirty.
+        if animating or self.dirty:
+            dt = self.clock.tick(self.fps) / 1000.0
+            events = pygame.event.get()
+        else:
+            timeout = IDLE_WAKE_MS
+            if self._wake_at is not None:
+                timeout = min(timeout, self._wake_at - pygame.time.get_ticks())
+            events = []
+            if timeout > 0:  # event.wait(0) would block forever
+                event = pygame.event.wait(timeout)
+                if event.type != pygame.NOEVENT:
+                    events.append(event)
+            events.extend(pygame.event.get())
+            dt = self.clock.tick(self.fps) / 1000.0
+        if self._wake_at is not None and pygame.time.get_ticks() >= self._wake_at:
+            self._wake_at = None
+            self.dirty = True
+        if animating or events:
+            self.dirty = True
+        return dt, events
+
+    def presented(self):
+        self.dirty = False
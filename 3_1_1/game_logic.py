@@ -2,19 +2,52 @@ import pygame
 import random
 import logging
 import os
+import numpy as np
 from settings import *
 from ui import *
-from screens import render_race_screen, show_results_screen
-
-def simulate_race(screen, sprotos, race_distance, race_duration, race_backgrounds, single_bg_options, trophy_image, race_number=None, tournament_mode=False, is_muted=False):
-    clock = pygame.time.Clock()
+from screens import render_race_screen, compose_race_layer, show_results_screen, render_mega_race_screen, get_mega_view_height, get_mega_max_scroll, get_mega_visible_lanes
+from rng import game_streams
+from race_engine import RaceEngine
+from roster import build_mega_roster, LeaderBoard
+from frame_scheduler import FrameScheduler
+from sprite_cache import get_transformed, RotationFrames
+from telemetry import start_telemetry
+from replay import play_replay
+from battle_engine import BattleState, MAX_HP, MAX_PP, MAX_AP, ATTACK, MAGIC, ABILITY, ITEM, roll_action, apply_action, skip_stunned_turn, POLICIES
+from battle_solver import battle_odds_service, optimal_policy
+
+fight_log = logging.getLogger("fight")
+
+def step_race_physics(sprotos, race_distance, finishers, accumulator, time_elapsed, rng, telemetry=None):
+    # Advance the race in fixed SIMULATION_DT steps so the outcome doesn't depend on frame rate.
+    # Returns the leftover accumulator (for render interpolation) and the new race clock.
+    steps = 0
+    while accumulator >= SIMULATION_DT and steps < MAX_PHYSICS_STEPS_PER_FRAME:
+        accumulator -= SIMULATION_DT
+        time_elapsed += SIMULATION_DT
+        steps += 1
+        for sproto in sprotos:
+            sproto.run(race_distance, SIMULATION_DT, finishers, time_elapsed, rng=rng)
+        if telemetry is not None:
+            telemetry.record(time_elapsed, sprotos)
+        if all(sproto.finished for sproto in sprotos):
+            return 0.0, time_elapsed
+    if steps == MAX_PHYSICS_STEPS_PER_FRAME:
+        # Too far behind: let the race run slower instead of spiralling
+        accumulator = min(accumulator, SIMULATION_DT)
+    return accumulator, time_elapsed
+
+def simulate_race(screen, sprotos, race_distance, race_duration, race_backgrounds, single_bg_options, trophy_image, race_number=None, tournament_mode=False, is_muted=False, rng=None):
+    if rng is None:
+        rng = game_streams.race()
+    frames = FrameScheduler()
     time_elapsed = 0
     race_finished = False
     winner = None
     choice = None
     running = True
-    log_timer = 0
     flash_timer = 0
+    physics_accumulator = 0.0
     finishers = []
     track_surface = cache_track_surface(race_distance, len(sprotos))
 
@@ -24,11 +57,12 @@ def simulate_race(screen, sprotos, race_distance, race_duration, race_background
     else:
         available_bgs = [bg for bg in single_bg_options if bg is not None]
         if available_bgs:
-            current_background = random.choice(available_bgs)
+            current_background = rng.choice(available_bgs)
             logging.info("Selected random background for single race.")
         else:
             current_background = None
             logging.warning("No valid backgrounds available for single race. Using blue background.")
+    race_layer = compose_race_layer(current_background, track_surface)
 
     if tournament_mode and race_number == 1:
         for sproto in sprotos:
@@ -63,12 +97,15 @@ def simulate_race(screen, sprotos, race_distance, race_duration, race_background
     end_game_button = Button("End Game", table_x + button_width + button_spacing, table_y + button_height + button_spacing, button_width, button_height, ORANGE)
     mute_button = MuteButton(SCREEN_WIDTH - 75, 10, 50, 20, GRAY)
     back_to_selection_button = Button("Back to Selection Screen", SCREEN_WIDTH - 225, 40, 200, 40, ORANGE, custom_font=race_button_font)
+    replay_button = Button("Watch Replay", SCREEN_WIDTH // 2 - button_width // 2, table_y + 2 * (button_height + button_spacing), button_width, button_height, PURPLE)
     buttons = [mute_button, back_to_selection_button]
 
+    telemetry = start_telemetry(sprotos, race_distance)
+
     while running:
-        dt = clock.tick(60) / 1000.0
+        dt, events = frames.next_frame(animating=True)
         flash_timer += dt
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 choice = "end"
                 running = False
@@ -80,19 +117,12 @@ def simulate_race(screen, sprotos, race_distance, race_duration, race_background
                 running = False
 
         if not race_finished:
-            time_elapsed += dt
-            for sproto in sprotos:
-                sproto.run(race_distance, dt, finishers, time_elapsed)
-
-            log_timer += dt
-            if log_timer >= 1.0:
-                logging.info(f"\nTime: {time_elapsed:.1f}s")
-                for sproto in sprotos:
-                    logging.info(f"{sproto.name}: Position={sproto.position:.2f}, Speed={sproto.current_speed:.2f}, Finished={sproto.finished}")
-                log_timer = 0
+            physics_accumulator, time_elapsed = step_race_physics(sprotos, race_distance, finishers, physics_accumulator + dt, time_elapsed, rng, telemetry)
 
             if all(sproto.finished for sproto in sprotos):
                 race_finished = True
+                if telemetry is not None:
+                    telemetry.close()
                 winner = finishers[0] if finishers else max(sprotos, key=lambda h: h.position)
                 for sproto in sprotos:
                     sproto.tournament_speeds.append(sproto.get_average_speed())
@@ -113,6 +143,8 @@ def simulate_race(screen, sprotos, race_distance, race_duration, race_background
 
         if race_finished and not tournament_mode:
             buttons = [retry_same_button, select_new_button, back_to_results_button, end_game_button, mute_button, back_to_selection_button]
+            if telemetry is not None:
+                buttons.append(replay_button)
             draw_text_with_shadow(screen, f"Winner: {winner.name}!", font, WHITE, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 50))
             pygame.display.flip()
             pygame.time.delay(2000)
@@ -126,8 +158,11 @@ def simulate_race(screen, sprotos, race_distance, race_duration, race_background
                     show_results = False
                 else:
                     post_race_running = True
+                    # The finished race is a still frame: redraw only after input
+                    post_race_frames = FrameScheduler()
                     while post_race_running:
-                        for event in pygame.event.get():
+                        _, events = post_race_frames.next_frame()
+                        for event in events:
                             if event.type == pygame.QUIT:
                                 choice = "end"
                                 post_race_running = False
@@ -159,9 +194,19 @@ def simulate_race(screen, sprotos, race_distance, race_duration, race_background
                                 post_race_running = False
                                 running = False
                                 show_results = False
-
-                        render_race_screen(screen, sprotos, race_distance, time_elapsed, race_number, winner, track_surface, buttons, current_background, flash_timer, is_muted)
-                        pygame.display.flip()
+                            if telemetry is not None and replay_button.is_clicked(event):
+                                keep_running, is_muted = play_replay(screen, telemetry.path, sprotos, race_distance, race_layer, winner, is_muted)
+                                if not keep_running:
+                                    choice = "end"
+                                    post_race_running = False
+                                    running = False
+                                    show_results = False
+                                post_race_frames.invalidate()
+
+                        if post_race_running and post_race_frames.dirty:
+                            render_race_screen(screen, sprotos, race_distance, time_elapsed, race_number, winner, race_layer, buttons, flash_timer, is_muted, interpolation=physics_accumulator / SIMULATION_DT)
+                            pygame.display.flip()
+                            post_race_frames.presented()
 
                 if choice in ["retry_same", "select_new", "end", "back_to_selection"]:
                     if choice in ["select_new", "back_to_selection", "end"]:
@@ -180,23 +225,27 @@ def simulate_race(screen, sprotos, race_distance, race_duration, race_background
                             except Exception as e:
                                 logging.error(f"Error loading race music (retry) '{RACE_MUSIC_PATH}': {e}")
         else:
-            render_race_screen(screen, sprotos, race_distance, time_elapsed, race_number, winner, track_surface, buttons, current_background, flash_timer, is_muted)
+            render_race_screen(screen, sprotos, race_distance, time_elapsed, race_number, winner, race_layer, buttons, flash_timer, is_muted, interpolation=physics_accumulator / SIMULATION_DT)
             pygame.display.flip()
 
         if race_finished and tournament_mode:
             running = False
 
+    if telemetry is not None:
+        telemetry.close()  # Already closed unless the race was left early
     return winner, choice, is_muted
 
-def simulate_all_characters_race(screen, sprotos, race_distance, race_duration, race_backgrounds, single_bg_options, trophy_image, is_muted=False):
-    clock = pygame.time.Clock()
+def simulate_all_characters_race(screen, sprotos, race_distance, race_duration, race_backgrounds, single_bg_options, trophy_image, is_muted=False, rng=None):
+    if rng is None:
+        rng = game_streams.race()
+    frames = FrameScheduler()
     time_elapsed = 0
     race_finished = False
     winner = None
     choice = None
     running = True
-    log_timer = 0
     flash_timer = 0
+    physics_accumulator = 0.0
     finishers = []
     
     num_sprotos = len(sprotos)
@@ -204,11 +253,12 @@ def simulate_all_characters_race(screen, sprotos, race_distance, race_duration,
     track_surface = cache_track_surface(race_distance, num_sprotos, lane_height=lane_height)
 
     available_bgs = [bg for bg in single_bg_options if bg is not None]
-    current_background = random.choice(available_bgs) if available_bgs else None
+    current_background = rng.choice(available_bgs) if available_bgs else None
     if current_background:
         logging.info("Selected random background for all-characters race.")
     else:
         logging.warning("No valid backgrounds available. Using blue background.")
+    race_layer = compose_race_layer(current_background, track_surface, lane_height=lane_height)
 
     if os.path.exists(RACE_MUSIC_PATH):
         try:
@@ -236,7 +286,7 @@ def simulate_all_characters_race(screen, sprotos, race_distance, race_duration,
     mute_button = MuteButton(SCREEN_WIDTH - 75, 10, 50, 20, GRAY)
     tournament_button_y = table_y + 2 * (button_height + button_spacing) + 10
     # Use a slightly smaller font for the button to ensure text fits
-    tournament_button_font = pygame.font.SysFont("arial", 22, bold=True)
+    tournament_button_font = get_font("arial", 22, bold=True)
     tournament_button = Button(
         "Run tournament with top 5",
         SCREEN_WIDTH // 2 - button_width // 2,
@@ -247,17 +297,20 @@ def simulate_all_characters_race(screen, sprotos, race_distance, race_duration,
         custom_font=tournament_button_font
     )
 
+    replay_button = Button("Watch Replay", SCREEN_WIDTH - 225, 40, 200, 40, PURPLE, custom_font=race_button_font)
     buttons = [mute_button]
     show_leaderboard = False
     leaderboard_delay = 9.1  # seconds
 
+    telemetry = start_telemetry(sprotos, race_distance)
+
     while running:
-        dt = clock.tick(60) / 1000.0
+        dt, events = frames.next_frame(animating=True)
         flash_timer += dt
         time_elapsed += dt
         if time_elapsed >= leaderboard_delay:
             show_leaderboard = True
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 choice = "end"
                 running = False
@@ -266,19 +319,12 @@ def simulate_all_characters_race(screen, sprotos, race_distance, race_duration,
                 pass
 
         if not race_finished:
-            time_elapsed += dt
-            for sproto in sprotos:
-                sproto.run(race_distance, dt, finishers, time_elapsed)
-
-            log_timer += dt
-            if log_timer >= 2.0:
-                logging.info(f"\nTime: {time_elapsed:.1f}s")
-                for sproto in sprotos:
-                    logging.info(f"{sproto.name}: Position={sproto.position:.2f}, Speed={sproto.current_speed:.2f}, Finished={sproto.finished}")
-                log_timer = 0
+            physics_accumulator, time_elapsed = step_race_physics(sprotos, race_distance, finishers, physics_accumulator + dt, time_elapsed, rng, telemetry)
 
             if all(sproto.finished for sproto in sprotos):
                 race_finished = True
+                if telemetry is not None:
+                    telemetry.close()
                 winner = finishers[0] if finishers else max(sprotos, key=lambda h: h.position)
                 for sproto in sprotos:
                     sproto.tournament_speeds.append(sproto.get_average_speed())
@@ -305,8 +351,11 @@ def simulate_all_characters_race(screen, sprotos, race_distance, race_duration,
                     show_results = False
                 else:
                     post_race_running = True
+                    # The finished race is a still frame: redraw only after input
+                    post_race_frames = FrameScheduler()
                     while post_race_running:
-                        for event in pygame.event.get():
+                        _, events = post_race_frames.next_frame()
+                        for event in events:
                             if event.type == pygame.QUIT:
                                 choice = "end"
                                 post_race_running = False
@@ -336,9 +385,19 @@ def simulate_all_characters_race(screen, sprotos, race_distance, race_duration,
                             if tournament_button.is_clicked(event):
                                 top5 = finishers[:5]
                                 return top5, "tournament_with_top5", is_muted
-
-                        render_race_screen(screen, sprotos, race_distance, time_elapsed, None, winner, track_surface, buttons, current_background, flash_timer, is_muted, lane_height=lane_height)
-                        pygame.display.flip()
+                            if telemetry is not None and replay_button.is_clicked(event):
+                                keep_running, is_muted = play_replay(screen, telemetry.path, sprotos, race_distance, race_layer, winner, is_muted, lane_height=lane_height)
+                                if not keep_running:
+                                    choice = "end"
+                                    post_race_running = False
+                                    running = False
+                                    show_results = False
+                                post_race_frames.invalidate()
+
+                        if post_race_running and post_race_frames.dirty:
+                            render_race_screen(screen, sprotos, race_distance, time_elapsed, None, winner, race_layer, buttons + ([replay_button] if telemetry is not None else []), flash_timer, is_muted, lane_height=lane_height, interpolation=physics_accumulator / SIMULATION_DT)
+                            pygame.display.flip()
+                            post_race_frames.presented()
 
                 if choice in ["retry_same", "select_new", "end"]:
                     if choice in ["select_new", "end"]:
@@ -357,7 +416,7 @@ def simulate_all_characters_race(screen, sprotos, race_distance, race_duration,
                             except Exception as e:
                                 logging.error(f"Error loading race music (retry) '{RACE_MUSIC_PATH}': {e}")
         else:
-            render_race_screen(screen, sprotos, race_distance, time_elapsed, None, winner, track_surface, [mute_button], current_background, flash_timer, is_muted, lane_height=lane_height)
+            render_race_screen(screen, sprotos, race_distance, time_elapsed, None, winner, race_layer, [mute_button], flash_timer, is_muted, lane_height=lane_height, interpolation=physics_accumulator / SIMULATION_DT)
 
             # Draw live leaderboard table after 9.1 seconds
             if show_leaderboard:
@@ -408,32 +467,201 @@ def simulate_all_characters_race(screen, sprotos, race_distance, race_duration,
 
             pygame.display.flip()
 
+    if telemetry is not None:
+        telemetry.close()  # Already closed unless the race was left early
+    return winner, choice, is_muted
+
+def simulate_mega_race(screen, sprotos, race_distance, race_backgrounds, single_bg_options, trophy_image, num_entrants=MEGA_RACE_ENTRANTS, is_muted=False, rng=None):
+    if rng is None:
+        rng = game_streams.numpy_generator()
+    frames = FrameScheduler()
+    roster = build_mega_roster(sprotos, num_entrants)
+    indices = np.arange(num_entrants)
+    roster.set_speeds(indices, SPEED_RANGE[0], SPEED_RANGE[1], rng)
+    roster.reset(indices, rng)
+    # Physics for the whole field runs in RaceEngine; the roster mirrors the lanes on screen
+    engine = RaceEngine(roster.min_speed, roster.max_speed, race_distance, SIMULATION_DT, rng, speeds=roster.current_speed)
+    logging.info(f"Mega Race started with {num_entrants} entrants")
+
+    time_elapsed = 0
+    race_finished = False
+    winner = None
+    choice = None
+    running = True
+    physics_accumulator = 0.0
+    scroll_y = 0
+    max_scroll = get_mega_max_scroll(num_entrants)
+    view_height = get_mega_view_height()
+    leaderboard = LeaderBoard(engine)
+    leaders = leaderboard.leaders()
+
+    available_bgs = [bg for bg in single_bg_options if bg is not None]
+    race_layer = compose_static_layer(available_bgs[rng.integers(len(available_bgs))] if available_bgs else None)
+
+    if os.path.exists(RACE_MUSIC_PATH):
+        try:
+            pygame.mixer.music.load(RACE_MUSIC_PATH)
+            pygame.mixer.music.set_volume(0 if is_muted else 0.35)
+            if not is_muted:
+                pygame.mixer.music.play(loops=-1)
+                logging.info(f"Playing race music: {RACE_MUSIC_PATH} at 35% volume")
+            else:
+                logging.info("Race music loaded but muted.")
+        except Exception as e:
+            logging.error(f"Error loading race music '{RACE_MUSIC_PATH}': {e}")
+    else:
+        logging.error(f"Race music file '{RACE_MUSIC_PATH}' not found.")
+
+    button_width = 250
+    button_height = 40
+    button_spacing = 20
+    table_x = (SCREEN_WIDTH - 2 * button_width - button_spacing) // 2
+    table_y = SCREEN_HEIGHT * 0.75
+    retry_same_button = Button("Run Again", table_x, table_y, button_width, button_height, RED)
+    select_new_button = Button("Select New Sprotos", table_x + button_width + button_spacing, table_y, button_width, button_height, BLUE)
+    back_to_results_button = Button("Back to Results", table_x, table_y + button_height + button_spacing, button_width, button_height, GREEN)
+    end_game_button = Button("End Game", table_x + button_width + button_spacing, table_y + button_height + button_spacing, button_width, button_height, ORANGE)
+    mute_button = MuteButton(SCREEN_WIDTH - 75, 10, 50, 20, GRAY)
+    buttons = [mute_button]
+
+    while running:
+        dt, events = frames.next_frame(animating=True)
+        for event in events:
+            if event.type == pygame.QUIT:
+                choice = "end"
+                running = False
+            clicked, is_muted = mute_button.is_clicked(event, is_muted, RACE_MUSIC_PATH)
+            if event.type == pygame.MOUSEWHEEL:
+                scroll_y -= event.y * MEGA_RACE_LANE_HEIGHT * 3
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:
+                    scroll_y -= MEGA_RACE_LANE_HEIGHT
+                elif event.key == pygame.K_DOWN:
+                    scroll_y += MEGA_RACE_LANE_HEIGHT
+                elif event.key == pygame.K_PAGEUP:
+                    scroll_y -= view_height
+                elif event.key == pygame.K_PAGEDOWN:
+                    scroll_y += view_height
+                elif event.key == pygame.K_HOME and leaders:
+                    scroll_y = leaders[0] * MEGA_RACE_LANE_HEIGHT - view_height // 2
+            scroll_y = max(0, min(int(scroll_y), max_scroll))
+
+        if not race_finished:
+            physics_accumulator += dt
+            steps = 0
+            while physics_accumulator >= SIMULATION_DT and steps < MAX_PHYSICS_STEPS_PER_FRAME and not engine.race_finished:
+                physics_accumulator -= SIMULATION_DT
+                steps += 1
+                engine.step()
+                leaderboard.record_finishers()
+            if steps == MAX_PHYSICS_STEPS_PER_FRAME:
+                physics_accumulator = min(physics_accumulator, SIMULATION_DT)
+            if steps:
+                time_elapsed = engine.time_elapsed
+                leaders = leaderboard.leaders()  # Just the recorded finishers once the board is final
+            # Only the lanes on screen are copied; scrolling can bring new ones in without a step
+            first, last = get_mega_visible_lanes(scroll_y, num_entrants)
+            roster.apply_race(engine, slice(first, last))
+
+            if engine.race_finished:
+                race_finished = True
+                roster.apply_race(engine)  # The results screens read the whole field
+                logging.info(f"Leaderboard pool rebuilt {leaderboard.rebuilds} times")
+                physics_accumulator = 0.0
+                finish_order = engine.finish_order()
+                winner = roster[finish_order[0]]
+                logging.info(f"\nMega Race finished in {time_elapsed:.1f}s! Top finishers:")
+                for place, index in enumerate(finish_order[:10]):
+                    logging.info(f"{place + 1}. {roster.names[index]}: Avg Speed={roster[index].get_average_speed():.2f}")
+
+        if race_finished:
+            buttons = [retry_same_button, select_new_button, back_to_results_button, end_game_button, mute_button]
+            render_mega_race_screen(screen, roster, race_distance, time_elapsed, scroll_y, leaders, winner, [mute_button], race_layer, is_muted)
+            pygame.display.flip()
+            pygame.time.delay(2000)
+
+            # The results table lists the front of the field; 10,000 rows would not be readable anyway
+            top_finishers = roster.sprotos(finish_order[:MEGA_RACE_RESULTS_ROWS])
+            show_results = True
+            while show_results:
+                result, is_muted = show_results_screen(screen, top_finishers, top_finishers, race_backgrounds, trophy_image, is_muted)
+                if not result:
+                    choice = "end"
+                    running = False
+                    show_results = False
+                else:
+                    post_race_running = True
+                    # The finished race is a still frame: redraw only after input
+                    post_race_frames = FrameScheduler()
+                    while post_race_running:
+                        _, events = post_race_frames.next_frame()
+                        for event in events:
+                            if event.type == pygame.QUIT:
+                                choice = "end"
+                                post_race_running = False
+                                running = False
+                                show_results = False
+                            if retry_same_button.is_clicked(event):
+                                choice = "retry_same"
+                                post_race_running = False
+                                running = False
+                                show_results = False
+                            if select_new_button.is_clicked(event):
+                                choice = "select_new"
+                                post_race_running = False
+                                running = False
+                                show_results = False
+                            if back_to_results_button.is_clicked(event):
+                                choice = "back_to_results"
+                                post_race_running = False
+                            if end_game_button.is_clicked(event):
+                                choice = "end"
+                                post_race_running = False
+                                running = False
+                                show_results = False
+                            clicked, is_muted = mute_button.is_clicked(event, is_muted, RACE_MUSIC_PATH)
+                            if event.type == pygame.MOUSEWHEEL:
+                                scroll_y = max(0, min(scroll_y - event.y * MEGA_RACE_LANE_HEIGHT * 3, max_scroll))
+
+                        if post_race_running and post_race_frames.dirty:
+                            render_mega_race_screen(screen, roster, race_distance, time_elapsed, scroll_y, leaders, winner, buttons, race_layer, is_muted)
+                            pygame.display.flip()
+                            post_race_frames.presented()
+            if choice in ["select_new", "end"]:
+                pygame.mixer.music.stop()
+                logging.info("Race music stopped.")
+        else:
+            render_mega_race_screen(screen, roster, race_distance, time_elapsed, scroll_y, leaders, winner, buttons, race_layer, is_muted, interpolation=physics_accumulator / SIMULATION_DT)
+            pygame.display.flip()
+
     return winner, choice, is_muted
 
-def run_pocket_sprotos_mode(screen, sprotos):
+def run_pocket_sprotos_mode(screen, sprotos, rng=None):
     import pygame
     import textwrap
-    clock = pygame.time.Clock()
+    if rng is None:
+        rng = game_streams.fight()
+    frames = FrameScheduler()
+    clock = frames.clock
     running = True
 
     # Each sproto gets 100 HP, 20 PP (mana), 3 AP (ability points)
-    hp = [100, 100]
-    max_hp = [100, 100]
-    pp = [20, 20]
-    max_pp = [20, 20]
-    ap = [3, 3]  # Ability Points
-    max_ap = [3, 3]
+    # Rules and state live in battle_engine; these lists are the battle state's own
     player = 0
     npc = 1
-    turn = random.choice([player, npc])
+    battle = BattleState(rng.choice([player, npc]))
+    turn = battle.turn
+    hp, pp, ap, sproto_juice, stunned = battle.hp, battle.pp, battle.ap, battle.juice, battle.stunned
+    max_hp = [MAX_HP, MAX_HP]
+    max_pp = [MAX_PP, MAX_PP]
+    max_ap = [MAX_AP, MAX_AP]  # Ability Points
     action_menu = ["Attack", "Magic", "Abilities", "Item"]
     selected_action = 0
-    sproto_juice = [1, 1]
-    menu_font = pygame.font.SysFont("arial", 32, bold=True)
-    hp_font = pygame.font.SysFont("arial", 18, bold=True)
-    msg_font = pygame.font.SysFont("arial", 26, bold=True)
-    damage_font = pygame.font.SysFont("arial", 36, bold=True)
-    log_font = pygame.font.SysFont("arial", 20)
+    menu_font = get_font("arial", 32, bold=True)
+    hp_font = get_font("arial", 18, bold=True)
+    msg_font = get_font("arial", 26, bold=True)
+    damage_font = get_font("arial", 36, bold=True)
+    log_font = get_font("arial", 20)
     message = ""
     message_timer = 0
     combat_text = ""
@@ -452,11 +680,9 @@ def run_pocket_sprotos_mode(screen, sprotos):
     anim_target = None
     anim_progress = 0.0
     anim_damage = 0
+    anim_result = None  # Applied to the battle state when the animation lands
     anim_stun = False
 
-    # Stun state: [player_stunned_turns, npc_stunned_turns]
-    stunned = [0, 0]
-
     # Log for actions
     action_log = []
     log_scroll = 0
@@ -465,7 +691,11 @@ def run_pocket_sprotos_mode(screen, sprotos):
     # Pre-scale images for animation (increase by 2x)
     orig_size = sprotos[0].sprite.get_size()
     scale_size = (int(orig_size[0] * 2.0), int(orig_size[1] * 2.0))
-    big_sprites = [pygame.transform.smoothscale(s.sprite, scale_size) for s in sprotos]
+    big_sprites = [get_transformed(s.sprite, scale_size, smooth=True) for s in sprotos]
+    spin_frames = [RotationFrames(sprite) for sprite in big_sprites]  # Sonic Dash spin
+    npc_policy = POLICIES.get(POCKET_NPC_POLICY, POLICIES["npc"])
+    if SHOW_FIGHT_ODDS or npc_policy is optimal_policy:
+        battle_odds_service.get()  # Starts solving the odds table if it isn't cached yet
     sprite_w, sprite_h = scale_size
 
     # Define image positions at the top level so they are accessible everywhere
@@ -477,15 +707,16 @@ def run_pocket_sprotos_mode(screen, sprotos):
     race_backgrounds, single_bg_options = load_race_backgrounds()
     fight_bg = None
     if single_bg_options:
-        fight_bg = random.choice(single_bg_options)
-        fight_bg = pygame.transform.scale(fight_bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        fight_bg = rng.choice(single_bg_options)
+        if fight_bg is not None:
+            fight_bg = compose_static_layer(fight_bg)  # Backgrounds already come screen-sized
     else:
         fight_bg = None
 
     # --- Show who attacks first ---
     first_attacker = sprotos[turn].name
     second_attacker = sprotos[1 - turn].name
-    announce_font = pygame.font.SysFont("arial", 44, bold=True)
+    announce_font = get_font("arial", 44, bold=True)
     # Split announce text into two lines for better fit
     announce_text1 = f"{first_attacker} got the drop on {second_attacker},"
     announce_text2 = f"{first_attacker} gets to attack first."
@@ -518,7 +749,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
         npc_action_delay = 0  # Ensure variable is always defined
 
     # Button setup for end-of-battle
-    button_font = pygame.font.SysFont("arial", 28, bold=True)
+    button_font = get_font("arial", 28, bold=True)
     button_w, button_h = 200, 60
     restart_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - button_w - 20, SCREEN_HEIGHT // 2 + 80, button_w, button_h)
     end_button_rect = pygame.Rect(SCREEN_WIDTH // 2 + 20, SCREEN_HEIGHT // 2 + 80, button_w, button_h)
@@ -543,11 +774,9 @@ def run_pocket_sprotos_mode(screen, sprotos):
     ability_menu_options = ["Sonic Dash"]
     ability_menu_selected = 0
 
-    # Fight log file
-    FIGHT_LOG_PATH = os.path.join(os.path.dirname(__file__), "sproto_fight.log")
+    # Fight log file (FIGHT_LOG_PATH), written by the logging thread
     def log_fight_entry(entry):
-        with open(FIGHT_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(entry + "\n")
+        fight_log.info(entry)
 
     def draw_battle_screen(anim_offset=None, bolt_pos=None, bolt_path=None, winner=None, show_buttons=False, spin_angle=0):
         # Draw background
@@ -567,17 +796,13 @@ def run_pocket_sprotos_mode(screen, sprotos):
 
         # Draw player sprite and border (with spin for ability animation)
         if animation_state == ANIMATION_ABILITY and anim_actor == player and spin_angle != 0:
-            rotated_sprite = pygame.transform.rotate(big_sprites[0], spin_angle)
-            rect = rotated_sprite.get_rect(center=(p_img_x + p_offset[0] + sprite_w // 2, p_img_y + p_offset[1] + sprite_h // 2))
-            screen.blit(rotated_sprite, rect.topleft)
+            spin_frames[0].blit(screen, (p_img_x + p_offset[0] + sprite_w // 2, p_img_y + p_offset[1] + sprite_h // 2), spin_angle)
         else:
             screen.blit(big_sprites[0], (p_img_x + p_offset[0], p_img_y + p_offset[1]))
         pygame.draw.rect(screen, WHITE, (p_img_x + p_offset[0], p_img_y + p_offset[1], sprite_w, sprite_h), 3)
         # Draw NPC sprite and border
         if animation_state == ANIMATION_ABILITY and anim_actor == npc and spin_angle != 0:
-            rotated_sprite = pygame.transform.rotate(big_sprites[1], spin_angle)
-            rect = rotated_sprite.get_rect(center=(n_img_x + n_offset[0] + sprite_w // 2, n_img_y + n_offset[1] + sprite_h // 2))
-            screen.blit(rotated_sprite, rect.topleft)
+            spin_frames[1].blit(screen, (n_img_x + n_offset[0] + sprite_w // 2, n_img_y + n_offset[1] + sprite_h // 2), spin_angle)
         else:
             screen.blit(big_sprites[1], (n_img_x + n_offset[0], n_img_y + n_offset[1]))
         pygame.draw.rect(screen, WHITE, (n_img_x + n_offset[0], n_img_y + n_offset[1], sprite_w, sprite_h), 3)
@@ -609,7 +834,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
         screen.blit(name_surf2, name_rect2)
 
         # Draw HP/PP/AP under name with color and shadow, inside a cell with transparent black background
-        status_font = pygame.font.SysFont("arial", 16, bold=True)
+        status_font = get_font("arial", 16, bold=True)
         # Player
         hp_text = f"HP: {hp[0]}/{max_hp[0]}"
         pp_text = f"PP: {pp[0]}/{max_pp[0]}"
@@ -635,6 +860,12 @@ def run_pocket_sprotos_mode(screen, sprotos):
         draw_text_with_shadow(screen, hp_text2, status_font, (0, 220, 0), (status_x2 + 12, status_y2 + 4))
         draw_text_with_shadow(screen, pp_text2, status_font, (0, 120, 255), (status_x2 + 12, status_y2 + 18))
         draw_text_with_shadow(screen, ap_text2, status_font, (255, 120, 0), (status_x2 + 80, status_y2 + 18))
+        battle_odds = battle_odds_service.get() if SHOW_FIGHT_ODDS else None
+        if battle_odds is not None:
+            # Win chances if both sides play perfectly from here, whatever the NPC actually does
+            player_odds = battle_odds.win_chance(battle, player)
+            draw_text_with_shadow(screen, f"Best play: {player_odds:.1%}", status_font, YELLOW, (status_x + 12, status_y + status_cell_h + 4))
+            draw_text_with_shadow(screen, f"Best play: {1 - player_odds:.1%}", status_font, YELLOW, (status_x2 + 12, status_y2 + status_cell_h + 4))
 
         # Draw damage numbers above character
         for idx in [0, 1]:
@@ -651,7 +882,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
             if crit_display[idx] and crit_display[idx] > 0:
                 x = p_img_x + sprite_w // 2 if idx == 0 else n_img_x + sprite_w // 2
                 y = (p_img_y if idx == 0 else n_img_y) - 80
-                crit_font = pygame.font.SysFont("arial", 32, bold=True)
+                crit_font = get_font("arial", 32, bold=True)
                 crit_surf = crit_font.render("Crit!", True, YELLOW)
                 crit_rect = crit_surf.get_rect(center=(x, y))
                 screen.blit(crit_surf, crit_rect)
@@ -659,7 +890,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
             if miss_display[idx] and miss_display[idx] > 0:
                 x = p_img_x + sprite_w // 2 if idx == 0 else n_img_x + sprite_w // 2
                 y = (p_img_y if idx == 0 else n_img_y) - 80
-                miss_font = pygame.font.SysFont("arial", 32, bold=True)
+                miss_font = get_font("arial", 32, bold=True)
                 miss_surf = miss_font.render("Miss!", True, RED)
                 miss_rect = miss_surf.get_rect(center=(x, y))
                 screen.blit(miss_surf, miss_rect)
@@ -667,7 +898,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
             if dodge_display[idx] and dodge_display[idx] > 0:
                 x = p_img_x + sprite_w // 2 if idx == 0 else n_img_x + sprite_w // 2
                 y = (p_img_y if idx == 0 else n_img_y) - 80
-                dodge_font = pygame.font.SysFont("arial", 32, bold=True)
+                dodge_font = get_font("arial", 32, bold=True)
                 dodge_surf = dodge_font.render("Dodge!", True, BLUE)
                 dodge_rect = dodge_surf.get_rect(center=(x, y))
                 screen.blit(dodge_surf, dodge_rect)
@@ -730,7 +961,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
         # Draw end-of-battle buttons if needed
         if show_buttons and winner:
             # Draw winner text
-            winner_font = pygame.font.SysFont("arial", 40, bold=True)
+            winner_font = get_font("arial", 40, bold=True)
             winner_text = f"{winner} wins!"
             winner_surf = winner_font.render(winner_text, True, YELLOW)
             winner_rect = winner_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
@@ -749,7 +980,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
     # --- Show who attacks first ---
     first_attacker = sprotos[turn].name
     second_attacker = sprotos[1 - turn].name
-    announce_font = pygame.font.SysFont("arial", 44, bold=True)
+    announce_font = get_font("arial", 44, bold=True)
     # Split announce text into two lines for better fit
     announce_text1 = f"{first_attacker} got the drop on {second_attacker},"
     announce_text2 = f"{first_attacker} gets to attack first."
@@ -782,6 +1013,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
         npc_action_delay = 0  # Ensure variable is always defined
 
     # --- Main game loop ---
+    events = []
     while running:
         # Handle animation state
         if animation_state == ANIMATION_FIGHT:
@@ -807,13 +1039,13 @@ def run_pocket_sprotos_mode(screen, sprotos):
                 anim_offset = [-offset_x, offset_y]
             draw_battle_screen(anim_offset=anim_offset)
             if animation_timer >= anim_time:
-                hp[anim_target] = max(0, hp[anim_target] - anim_damage)
+                apply_action(battle, anim_result)
                 damage_display[anim_target] = (anim_damage, 3.0)
                 # Only append a message here if not already appended above
                 # (Do not append again, as the combat_text is already added in the logic above)
                 animation_state = ANIMATION_NONE
                 animation_timer = 0
-                turn = 1 - anim_actor
+                turn = battle.turn
             continue
         elif animation_state == ANIMATION_MAGIC:
             anim_time = 0.8
@@ -834,14 +1066,14 @@ def run_pocket_sprotos_mode(screen, sprotos):
                 x = int(start[0] + (end[0] - start[0]) * t)
                 y = int(start[1] + (end[1] - start[1]) * t)
                 if i not in [0, steps]:
-                    y += random.randint(-18, 18)
+                    y += random.randint(-18, 18)  # Cosmetic only, keep it off the fight stream
                 bolt_path.append((x, y))
             head_idx = int(progress * steps)
             head_idx = min(head_idx, steps)
             bolt_pos = bolt_path[head_idx]
             draw_battle_screen(bolt_pos=bolt_pos, bolt_path=bolt_path[:head_idx+1])
             if animation_timer >= anim_time:
-                hp[anim_target] = max(0, hp[anim_target] - anim_damage)
+                apply_action(battle, anim_result)
                 damage_display[anim_target] = (anim_damage, 3.0)
                 # Only log spell once (do not append to action_log here)
                 combat_text = f"{sprotos[anim_actor].name} casts Potter Bolt! {sprotos[anim_target].name} takes {anim_damage} damage."
@@ -849,7 +1081,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
                 # action_log.append(combat_text)  # <-- REMOVE this line to prevent double logging
                 animation_state = ANIMATION_NONE
                 animation_timer = 0
-                turn = 1 - anim_actor
+                turn = battle.turn
             continue
         elif animation_state == ANIMATION_ABILITY:
             # Sonic Dash animation: rush and spin
@@ -873,20 +1105,23 @@ def run_pocket_sprotos_mode(screen, sprotos):
             else:
                 draw_battle_screen(anim_offset=[rush_x - n_img_x, rush_y - n_img_y], spin_angle=spin_angle)
             if animation_timer >= anim_time:
-                # Apply damage and stun
-                hp[anim_target] = max(0, hp[anim_target] - anim_damage)
+                # Apply damage and stun (for 1 turn)
+                apply_action(battle, anim_result)
                 damage_display[anim_target] = (anim_damage, 3.0)
-                stunned[anim_target] = 1  # Stun for 1 turn
                 combat_text = f"{sprotos[anim_actor].name} used Sonic Dash! {sprotos[anim_target].name} is stunned and takes {anim_damage} damage."
                 combat_text_timer = 2.0
                 action_log.append(combat_text)
                 log_fight_entry(combat_text)
                 animation_state = ANIMATION_NONE
                 animation_timer = 0
-                turn = 1 - anim_actor
+                turn = battle.turn
             continue
 
-        draw_battle_screen()
+        # Once the popups and combat text have faded, the player's turn is a still frame
+        animating = turn != player or bool(combat_text) or any(damage_display + crit_display + miss_display + dodge_display)
+        if animating or frames.dirty:
+            draw_battle_screen()
+            frames.presented()
 
         # Update damage/crit/miss/dodge display timers
         for idx in [0, 1]:
@@ -923,27 +1158,29 @@ def run_pocket_sprotos_mode(screen, sprotos):
             action_log.append(f"{winner} wins!")
             # Show winner and buttons, wait for user input
             waiting_for_choice = True
+            choice_frames = FrameScheduler()
             while waiting_for_choice:
-                draw_battle_screen(winner=winner, show_buttons=True)
-                for event in pygame.event.get():
+                _, choice_events = choice_frames.next_frame()
+                if choice_frames.dirty:
+                    draw_battle_screen(winner=winner, show_buttons=True)
+                    choice_frames.presented()
+                for event in choice_events:
                     if event.type == pygame.QUIT:
                         return
                     elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                         mx, my = event.pos
                         if restart_button_rect.collidepoint(mx, my):
-                            # Restart round: reset HP, PP, juice, logs, randomize first attacker
-                            hp[:] = [100, 100]
-                            pp[:] = [20, 20]
-                            sproto_juice[:] = [1, 1]
+                            # Restart round: fresh battle state, logs, randomize first attacker
+                            battle.reset(rng.choice([player, npc]))
+                            turn = battle.turn
                             damage_display[:] = [None, None]
                             action_log.clear()
                             combat_text = ""
                             combat_text_timer = 0
-                            turn = random.choice([player, npc])
                             # Announce who attacks first again
                             first_attacker = sprotos[turn].name
                             second_attacker = sprotos[1 - turn].name
-                            announce_font = pygame.font.SysFont("arial", 44, bold=True)
+                            announce_font = get_font("arial", 44, bold=True)
                             # Split announce text into two lines for better fit
                             announce_text1 = f"{first_attacker} got the drop on {second_attacker},"
                             announce_text2 = f"{first_attacker} gets to attack first."
@@ -971,20 +1208,21 @@ def run_pocket_sprotos_mode(screen, sprotos):
                             waiting_for_choice = False
                         elif end_button_rect.collidepoint(mx, my):
                             return  # End game, go back to selection
-                clock.tick(30)
+            events = []
+            frames.invalidate()
             continue
 
         if animation_state == ANIMATION_NONE:
             # Handle stun: skip turn if stunned
             if stunned[turn] > 0:
                 action_log.append(f"{sprotos[turn].name} is stunned and skips their turn!")
-                stunned[turn] -= 1
-                turn = 1 - turn
+                skip_stunned_turn(battle)
+                turn = battle.turn
                 continue
 
             if turn == player:
                 # --- Player input handling ---
-                for event in pygame.event.get():
+                for event in events:
                     if event.type == pygame.QUIT:
                         running = False
                         return
@@ -1049,11 +1287,8 @@ def run_pocket_sprotos_mode(screen, sprotos):
                                     log_scroll += 1
                             elif event.key == pygame.K_RETURN:
                                 if action_menu[selected_action] == "Attack":
-                                    roll = random.random()
-                                    miss = roll < 0.10
-                                    dodge = not miss and random.random() < 0.10
-                                    crit = not miss and not dodge and random.random() < 0.20
-                                    dmg = random.randint(8, 10)
+                                    result = roll_action(battle, ATTACK, rng)
+                                    miss, dodge, crit, dmg = result.miss, result.dodge, result.crit, result.damage
                                     if miss:
                                         dmg = 0
                                         combat_text = f"{sprotos[player].name} missed!"
@@ -1067,6 +1302,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
                                         anim_actor = player
                                         anim_target = npc
                                         anim_damage = dmg
+                                        anim_result = result
                                         log_fight_entry(combat_text)
                                         continue
                                     elif dodge:
@@ -1082,11 +1318,11 @@ def run_pocket_sprotos_mode(screen, sprotos):
                                         anim_actor = player
                                         anim_target = npc
                                         anim_damage = dmg
+                                        anim_result = result
                                         log_fight_entry(combat_text)
                                         continue
                                     else:
                                         if crit:
-                                            dmg = int(dmg * 2.5)
                                             combat_text = f"Critical hit! {sprotos[player].name} deals {dmg}!"
                                             combat_text_timer = 1.5
                                             action_log.append(combat_text)
@@ -1100,6 +1336,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
                                         anim_actor = player
                                         anim_target = npc
                                         anim_damage = dmg
+                                        anim_result = result
                                         log_fight_entry(combat_text)
                                     continue
                                 elif action_menu[selected_action] == "Magic":
@@ -1123,13 +1360,14 @@ def run_pocket_sprotos_mode(screen, sprotos):
                                     MAGIC_MENU = False
                                 elif magic_menu_selected == 0:  # Only one spell for now
                                     if pp[player] >= 10:
-                                        dmg = random.randint(33, 39)
-                                        pp[player] -= 10
+                                        result = roll_action(battle, MAGIC, rng)
+                                        dmg = result.damage
                                         animation_state = ANIMATION_MAGIC
                                         animation_timer = 0
                                         anim_actor = player
                                         anim_target = npc
                                         anim_damage = dmg
+                                        anim_result = result
                                         MAGIC_MENU = False
                                         # Only log here, not in animation
                                         log_fight_entry(f"{sprotos[player].name} casts Potter Bolt! {sprotos[npc].name} takes {dmg} damage.")
@@ -1149,13 +1387,13 @@ def run_pocket_sprotos_mode(screen, sprotos):
                                     ITEM_MENU = False
                                 elif item_menu_selected == 0:  # Sproto Juice
                                     if sproto_juice[player] > 0:
-                                        heal = 25
-                                        hp[player] = min(max_hp[player], hp[player] + heal)
-                                        sproto_juice[player] -= 1
+                                        result = roll_action(battle, ITEM, rng)
+                                        heal = result.heal
+                                        apply_action(battle, result)
                                         damage_display[player] = (-heal, 3.0)
                                         action_log.append(f"{sprotos[player].name} uses Sproto Juice! Recovers {heal} HP.")
                                         log_fight_entry(f"{sprotos[player].name} uses Sproto Juice! Recovers {heal} HP.")
-                                        turn = npc
+                                        turn = battle.turn
                                         ITEM_MENU = False  # <-- Close the item menu after use
                                     else:
                                         action_log.append("No Sproto Juice left!")
@@ -1172,13 +1410,14 @@ def run_pocket_sprotos_mode(screen, sprotos):
                                     ABILITY_MENU = False
                                 elif ability_menu_selected == 0:  # Sonic Dash
                                     if ap[player] > 0:
-                                        dmg = random.randint(5, 10)
-                                        ap[player] -= 1
+                                        result = roll_action(battle, ABILITY, rng)
+                                        dmg = result.damage
                                         animation_state = ANIMATION_ABILITY
                                         animation_timer = 0
                                         anim_actor = player
                                         anim_target = npc
                                         anim_damage = dmg
+                                        anim_result = result
                                         ABILITY_MENU = False
                                     else:
                                         action_log.append("Not enough AP for Sonic Dash!")
@@ -1195,25 +1434,16 @@ def run_pocket_sprotos_mode(screen, sprotos):
                     continue
 
                 # --- NPC AI: choose action ---
-                npc_can_magic = pp[npc] >= 10
-                npc_can_item = sproto_juice[npc] > 0 and hp[npc] < max_hp[npc]
-                npc_can_ability = ap[npc] > 0
-                # Simple AI: prefer ability if available and not just stunned, else magic, else heal, else attack
-                if npc_can_ability and stunned[npc] == 0 and random.random() < 0.4:
-                    npc_action = "Ability"
-                elif npc_can_magic and (hp[player] > 35 or random.random() < 0.4):
-                    npc_action = "Magic"
-                elif npc_can_item and hp[npc] <= max_hp[npc] * 0.5 and random.random() < 0.5:
-                    npc_action = "Item"
-                else:
-                    npc_action = "Attack"
+                if npc_policy is optimal_policy and battle_odds_service.get() is None:
+                    if not battle_odds_service.failed:
+                        clock.tick(60)  # Thinking: the odds table is still being solved
+                        continue
+                    npc_policy = POLICIES["npc"]
+                npc_action = npc_policy(battle, npc, rng)
 
                 if npc_action == "Attack":
-                    roll = random.random()
-                    miss = roll < 0.10
-                    dodge = not miss and random.random() < 0.10
-                    crit = not miss and not dodge and random.random() < 0.20
-                    dmg = random.randint(8, 10)
+                    result = roll_action(battle, ATTACK, rng)
+                    miss, dodge, crit, dmg = result.miss, result.dodge, result.crit, result.damage
                     if miss:
                         dmg = 0
                         combat_text = f"{sprotos[npc].name} missed!"
@@ -1225,6 +1455,7 @@ def run_pocket_sprotos_mode(screen, sprotos):
                         anim_actor = npc
                         anim_target = player
                         anim_damage = dmg
+                        anim_result = result
                         log_fight_entry(combat_text)
                         npc_action_delay = 1.5
                         continue
@@ -1239,12 +1470,12 @@ def run_pocket_sprotos_mode(screen, sprotos):
                         anim_actor = npc
                         anim_target = player
                         anim_damage = dmg
+                        anim_result = result
                         log_fight_entry(combat_text)
                         npc_action_delay = 1.5
                         continue
                     else:
                         if crit:
-                            dmg = int(dmg * 2.5)
                             combat_text = f"Critical hit! {sprotos[npc].name} deals {dmg}!"
                             combat_text_timer = 1.5
                             action_log.append(combat_text)
@@ -1258,17 +1489,19 @@ def run_pocket_sprotos_mode(screen, sprotos):
                         anim_actor = npc
                         anim_target = player
                         anim_damage = dmg
+                        anim_result = result
                         log_fight_entry(combat_text)
                         npc_action_delay = 1.5
                         continue
                 elif npc_action == "Magic":
-                    dmg = random.randint(33, 39)
-                    pp[npc] -= 10
+                    result = roll_action(battle, MAGIC, rng)
+                    dmg = result.damage
                     animation_state = ANIMATION_MAGIC
                     animation_timer = 0
                     anim_actor = npc
                     anim_target = player
                     anim_damage = dmg
+                    anim_result = result
                     # Only log here, not in animation
                     combat_text = f"{sprotos[npc].name} casts Potter Bolt! {sprotos[player].name} takes {dmg} damage."
                     combat_text_timer = 2.0
@@ -1277,26 +1510,29 @@ def run_pocket_sprotos_mode(screen, sprotos):
                     npc_action_delay = 1.5
                     continue
                 elif npc_action == "Item":
-                    heal = 25
-                    hp[npc] = min(max_hp[npc], hp[npc] + heal)
-                    sproto_juice[npc] -= 1
+                    result = roll_action(battle, ITEM, rng)
+                    heal = result.heal
+                    apply_action(battle, result)
                     damage_display[npc] = (-heal, 3.0)
                     combat_text = f"{sprotos[npc].name} uses Sproto Juice! Recovers {heal} HP."
                     combat_text_timer = 1.5
                     action_log.append(combat_text)
                     log_fight_entry(combat_text)
                     npc_action_delay = 1.5
-                    turn = player
+                    turn = battle.turn
                     continue
                 elif npc_action == "Ability":
-                    dmg = random.randint(5, 10)
-                    ap[npc] -= 1
+                    result = roll_action(battle, ABILITY, rng)
+                    dmg = result.damage
                     animation_state = ANIMATION_ABILITY
                     animation_timer = 0
                     anim_actor = npc
                     anim_target = player
                     anim_damage = dmg
+                    anim_result = result
                     npc_action_delay = 1.5
                     continue
 
-        clock.tick(60)
\ No newline at end of file
+        if turn == player and events:
+            frames.invalidate()  # Show whatever the input just changed
+        _, events = frames.next_frame(animating)
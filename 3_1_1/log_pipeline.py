@@ -0,0 +1,165 @@
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+from settings import *
+
+# Game code only ever puts records on a bounded queue; one writer thread formats them and
+# writes them out in batches, with a single flush per batch. A full queue drops records
+# (and says how many later) rather than making a frame wait on the disk. Log files rotate
+# at LOG_MAX_BYTES and old ones are gzipped. The "fight" subsystem goes to its own file.
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+def _gzip_rotator(source, dest):
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+class BatchedFileHandler(logging.handlers.RotatingFileHandler):
+    # Flushing is left to the writer thread, once per batch instead of once per record
+    def __init__(self, path, formatter):
+        super().__init__(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+        self.namer = _gzip_namer
+        self.rotator = _gzip_rotator
+        self.setFormatter(formatter)
+
+    def _open(self):
+        stream = super()._open()
+        self._size = stream.seek(0, 2)
+        return stream
+
+    def shouldRollover(self, record):
+        # Keeps its own byte count: seek()/tell() on the stream would flush it for every record
+        if self.stream is None:
+            self.stream = self._open()
+        return self.maxBytes > 0 and self._size >= self.maxBytes
+
+    def format(self, record):
+        message = super().format(record)
+        self._size += len(message) + 1
+        return message
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    # Tags each record with the handlers it is meant for and never blocks the caller
+    def __init__(self, log_queue, target):
+        super().__init__(log_queue)
+        self.target = target
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait((self.target, record))
+        except queue.Full:
+            self.dropped += 1
+
+class LogWriter(threading.Thread):
+    def __init__(self, log_queue, targets):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = log_queue
+        self.targets = targets  # Target name -> handlers
+
+    def run(self):
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < LOG_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            touched = set()
+            for item in batch:
+                if item is None:
+                    running = False
+                    continue
+                target, record = item
+                for handler in self.targets[target]:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+                        touched.add(handler)
+            for handler in touched:
+                if isinstance(handler, BatchedFileHandler):
+                    handler.flush_batch()
+                else:
+                    handler.flush()
+            self._report_drops()
+
+    def _report_drops(self):
+        for handler in _queue_handlers:
+            if handler.dropped:
+                dropped, handler.dropped = handler.dropped, 0
+                record = logging.LogRecord("logging", logging.WARNING, __file__, 0, f"Log queue full: dropped {dropped} '{handler.target}' records", None, None)
+                for target_handler in self.targets["main"]:
+                    target_handler.handle(record)
+
+_log_queue = None
+_writer = None
+_queue_handlers = []
+
+def setup_logging():
+    global _log_queue, _writer
+    if _writer is not None:
+        return
+    formatter = logging.Formatter(LOG_FORMAT)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    targets = {"main": [console_handler], "fight": []}
+    errors = []
+    try:
+        log_dir = os.path.dirname(LOG_PATH)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        targets["main"].insert(0, BatchedFileHandler(LOG_PATH, formatter))
+    except OSError as e:
+        errors.append(f"Failed to setup file logging to '{LOG_PATH}': {e}. Using console logging.")
+    try:
+        targets["fight"].append(BatchedFileHandler(FIGHT_LOG_PATH, logging.Formatter("%(message)s")))
+    except OSError as e:
+        errors.append(f"Failed to open fight log '{FIGHT_LOG_PATH}': {e}. Fight entries go to the main log.")
+        targets["fight"] = targets["main"]
+
+    _log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_add_queue_handler("main"))
+    fight_logger = logging.getLogger("fight")
+    fight_logger.propagate = False
+    fight_logger.addHandler(_add_queue_handler("fight"))
+    for name, level in LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+
+    _writer = LogWriter(_log_queue, targets)
+    _writer.start()
+    atexit.register(shutdown_logging)
+    for message in errors:
+        logging.error(message)
+
+def _add_queue_handler(target):
+    handler = DroppingQueueHandler(_log_queue, target)
+    _queue_handlers.append(handler)
+    return handler
+
+def shutdown_logging():
+    # Writes out whatever is still queued; runs at exit
+    global _writer
+    if _writer is None:
+        return
+    _log_queue.put(None)  # Blocking put: the writer is draining, so there will be room
+    _writer.join(timeout=5)
+    for handlers in _writer.targets.values():
+        for handler in handlers:
+            handler.close()
+    _writer = None
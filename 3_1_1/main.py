@@ -3,16 +3,16 @@ import logging
 import os
 from settings import *
 from assets import *
+from asset_registry import registry
 from sproto import Sproto
 from screens import select_sprotos, show_tournament_results, MuteButton
-from game_logic import simulate_race, simulate_all_characters_race, run_pocket_sprotos_mode
+from game_logic import simulate_race, simulate_all_characters_race, simulate_mega_race, run_pocket_sprotos_mode
+from odds import odds_service
+from battle_solver import battle_odds_service
+from rng import game_streams
 
 def check_missing_images():
-    missing_files = []
-    for filename in image_filenames:
-        file_path = os.path.join(SPROTO_IMAGE_PATH, filename)
-        if not os.path.exists(file_path):
-            missing_files.append(filename)
+    missing_files = [os.path.basename(registry.path(asset_id)) for asset_id in registry.missing("sproto:")]
     if missing_files:
         logging.warning(f"Missing racer images: {', '.join(missing_files)}. Using fallback images.")
 
@@ -23,6 +23,11 @@ def main():
     pygame.display.set_caption("Sproto Race Simulation")
 
     check_missing_images()
+    # Only the selection screen's assets and the racers are waited for; race backgrounds decode on first use
+    if not show_loading_screen(screen, asset_loader, [SELECTION_BG_PATH, TROPHY_PATH], request_sproto_images()):
+        asset_loader.shutdown()
+        pygame.quit()
+        return
     sproto_images = load_sproto_images()
     selection_background = load_selection_background(screen)
     trophy_image = load_trophy_image()
@@ -31,10 +36,14 @@ def main():
         return
 
     race_backgrounds, single_bg_options = load_race_backgrounds()
-    if "results" not in race_backgrounds or race_backgrounds["results"] is None:
-        logging.error("Results background failed to load. Ensure the file path is correct.")
+    if not registry.exists("bg:results"):
+        logging.error("Results background not found. Ensure the file path is correct.")
         return
+    # Single-race backgrounds are the likeliest next need, so decode them while the player picks
+    race_backgrounds.prefetch(["single_options"])
 
+    # Plain Sprotos for the live races: Sproto.run touches a dozen fields a tick, which
+    # roster views would route through the arrays. Roster is for Mega Race's batch work.
     sproto_list = [Sproto(name, 0, i, sproto_images[i]) for i, name in enumerate(sproto_names)]
 
     logging.info("Available Sprotos:")
@@ -55,10 +64,10 @@ def main():
                 logging.info("No sprotos selected or window closed. Exiting.")
                 break
             selected_sprotos, is_tournament, is_muted, race_mode = result
-            if not selected_sprotos and race_mode not in ["all_characters", "pocket_sprotos", "cheese_mode"]:
+            if not selected_sprotos and race_mode not in ["all_characters", "mega_race", "pocket_sprotos", "cheese_mode"]:
                 logging.info("No sprotos selected or window closed. Exiting.")
                 break
-            if race_mode == "all_characters":
+            if race_mode in ["all_characters", "mega_race"]:
                 selected_sprotos = sproto_list
                 is_tournament = False
 
@@ -70,17 +79,39 @@ def main():
             race_mode = None
             continue
 
+        # --- Handle Mega Race mode ---
+        if race_mode == "mega_race":
+            winner, choice, is_muted = simulate_mega_race(
+                screen,
+                sproto_list,
+                RACE_DISTANCE,
+                race_backgrounds,
+                single_bg_options,
+                trophy_image,
+                is_muted=is_muted,
+                rng=game_streams.numpy_generator()
+            )
+            if winner:
+                logging.info(f"\nMega Race Winner: {winner.name}")
+            if choice == "end":
+                game_running = False
+            elif choice != "retry_same":
+                selected_sprotos = None
+                race_mode = None
+            continue
+
         # --- Handle Pocket Sprotos mode BEFORE any race logic ---
         if race_mode == "pocket_sprotos":
-            run_pocket_sprotos_mode(screen, selected_sprotos)
+            run_pocket_sprotos_mode(screen, selected_sprotos, rng=game_streams.fight())
             selected_sprotos = None
             race_mode = None
             continue
 
+        race_rng = game_streams.race()
         for i, sproto in enumerate(selected_sprotos):
             sproto.lane = i
-            sproto.set_speed(SPEED_RANGE[0], SPEED_RANGE[1])
-            sproto.reset(RACE_DISTANCE)
+            sproto.set_speed(SPEED_RANGE[0], SPEED_RANGE[1], rng=race_rng)
+            sproto.reset(RACE_DISTANCE, rng=race_rng)
             sproto.reset_tournament()
 
         logging.info("\nSelected Sprotos for This Race:")
@@ -106,8 +137,8 @@ def main():
             for race_num in range(1, 8):
                 logging.info(f"\n--- Starting Race #{race_num} ---")
                 for sproto in selected_sprotos:
-                    sproto.reset(RACE_DISTANCE)
-                winner, choice, is_muted = simulate_race(screen, selected_sprotos, RACE_DISTANCE, RACE_DURATION, race_backgrounds, single_bg_options, trophy_image, race_number=race_num, tournament_mode=True, is_muted=is_muted)
+                    sproto.reset(RACE_DISTANCE, rng=race_rng)
+                winner, choice, is_muted = simulate_race(screen, selected_sprotos, RACE_DISTANCE, RACE_DURATION, race_backgrounds, single_bg_options, trophy_image, race_number=race_num, tournament_mode=True, is_muted=is_muted, rng=race_rng)
                 if winner:
                     logging.info(f"Race #{race_num} Winner: {winner.name}")
                 if choice == "end":
@@ -147,7 +178,8 @@ def main():
                     race_backgrounds, 
                     single_bg_options, 
                     trophy_image, 
-                    is_muted=is_muted
+                    is_muted=is_muted,
+                    rng=race_rng
                 )
                 # Handle new 3-value return for tournament with top 5
                 if isinstance(result, tuple) and len(result) == 3 and result[1] == "tournament_with_top5":
@@ -167,7 +199,8 @@ def main():
                         race_backgrounds, 
                         single_bg_options, 
                         trophy_image, 
-                        is_muted=is_muted
+                        is_muted=is_muted,
+                        rng=race_rng
                     )
                 except Exception as e:
                     logging.error(f"Error during single racer results screen: {e}")
@@ -188,6 +221,9 @@ def main():
             else:
                 game_running = False
 
+    odds_service.shutdown()
+    battle_odds_service.shutdown()
+    asset_loader.shutdown()
     pygame.mixer.quit()
     pygame.quit()
 
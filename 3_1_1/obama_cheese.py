@@ -2,9 +2,11 @@ import pygame
 import random
 import os
 from settings import *
+from sprite_cache import get_sprite_variant
+from frame_scheduler import FrameScheduler
 
 def run_obama_cheese_mode(screen):
-    clock = pygame.time.Clock()
+    frames = FrameScheduler()
     running = True
 
     # Load Obama sprite (find by name)
@@ -20,10 +22,10 @@ def run_obama_cheese_mode(screen):
         obama_idx = 0  # fallback
 
     sproto_images = load_sproto_images()
-    obama_sprite = pygame.transform.scale(sproto_images[obama_idx], (100, 100))
+    obama_sprite = get_sprite_variant(sproto_images[obama_idx], 100)
 
     # Cheese settings
-    cheese_font = pygame.font.SysFont("comic sans ms", 28, bold=True)  # Smaller cheese text
+    cheese_font = get_font("comic sans ms", 28, bold=True)  # Smaller cheese text
     cheese_text = cheese_font.render("cheese", True, YELLOW)
     cheese_rect = cheese_text.get_rect()
     cheese_pos = [random.randint(100, SCREEN_WIDTH - 200), random.randint(100, SCREEN_HEIGHT - 200)]
@@ -33,7 +35,7 @@ def run_obama_cheese_mode(screen):
     obama_speed = 5.0
 
     # End game button
-    button_font = pygame.font.SysFont("arial", 32, bold=True)
+    button_font = get_font("arial", 32, bold=True)
     button_w, button_h = 220, 70
     end_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - button_w // 2, SCREEN_HEIGHT - 120, button_w, button_h)
 
@@ -48,9 +50,9 @@ def run_obama_cheese_mode(screen):
     cheese_timer = 0.0
 
     while running:
-        dt = clock.tick(60) / 1000.0
+        dt, events = frames.next_frame(animating=True)
         cheese_timer += dt
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 return
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -86,11 +88,11 @@ def run_obama_cheese_mode(screen):
         obama_rect = obama_sprite.get_rect(center=(int(obama_pos[0]), int(obama_pos[1])))
         screen.blit(obama_sprite, obama_rect)
         # Draw cheese mode timer
-        timer_font = pygame.font.SysFont("arial", 28, bold=True)
+        timer_font = get_font("arial", 28, bold=True)
         timer_text = timer_font.render(f"Time: {cheese_timer:.1f}s", True, WHITE)
         screen.blit(timer_text, (30, 30))
         # Draw "He really wants it!" blinking text
-        want_font = pygame.font.SysFont("arial", 36, bold=True)
+        want_font = get_font("arial", 36, bold=True)
         blink = int(pygame.time.get_ticks() / 400) % 2 == 0
         want_color = YELLOW if blink else WHITE
         want_text = want_font.render("He really wants it.", True, want_color)
@@ -0,0 +1,117 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from settings import RACE_DISTANCE, SPEED_RANGE, SIMULATION_DT, ODDS_NUM_RACES, ODDS_PROCESSES, ODDS_SHARD_RACES
+from race_engine import simulate_race_batch
+from rng import RandomStreams, game_streams
+
+class LineupOdds:
+    def __init__(self, place_counts, num_races):
+        self.place_counts = place_counts  # place_counts[lane, place - 1]
+        self.num_races = num_races
+        self.place_distribution = place_counts / num_races
+        self.win = self.place_distribution[:, 0]
+        self.podium = self.place_distribution[:, :3].sum(axis=1)
+        places = np.arange(1, place_counts.shape[1] + 1)
+        self.expected_place = (self.place_distribution * places).sum(axis=1)
+
+def lineup_speed_ranges(sprotos):
+    # Racers on the selection screen have not had set_speed called yet
+    min_speeds = [s.min_speed if s.max_speed > 0 else SPEED_RANGE[0] for s in sprotos]
+    max_speeds = [s.max_speed if s.max_speed > 0 else SPEED_RANGE[1] for s in sprotos]
+    return min_speeds, max_speeds
+
+def _simulate_shard(min_speeds, max_speeds, num_races, race_distance, dt, seed):
+    places = simulate_race_batch(min_speeds, max_speeds, num_races, race_distance=race_distance, dt=dt, rng=np.random.default_rng(seed))
+    num_racers = len(min_speeds)
+    counts = np.zeros((num_racers, num_racers), dtype=np.int64)
+    for lane in range(num_racers):
+        counts[lane] = np.bincount(places[:, lane] - 1, minlength=num_racers)
+    return counts
+
+def _shard_sizes(num_races, shard_races):
+    # Fixed-size shards: the split, and so a seeded result, doesn't depend on the core count
+    full, rest = divmod(num_races, shard_races)
+    return [shard_races] * full + ([rest] if rest else [])
+
+class OddsService:
+    def __init__(self, num_races=ODDS_NUM_RACES, processes=ODDS_PROCESSES, race_distance=RACE_DISTANCE, dt=SIMULATION_DT, seed=None):
+        self.num_races = num_races
+        self.streams = RandomStreams(seed)
+        self.processes = processes
+        self.race_distance = race_distance
+        self.dt = dt
+        self._executor = None
+        self._cache = {}
+        self._pending = {}
+
+    def lineup_key(self, sprotos, num_races=None):
+        min_speeds, max_speeds = lineup_speed_ranges(sprotos)
+        return (tuple(zip(min_speeds, max_speeds)), self.race_distance, self.dt, num_races or self.num_races)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        return self._executor
+
+    def _submit(self, sprotos, num_races):
+        min_speeds, max_speeds = lineup_speed_ranges(sprotos)
+        executor = self._get_executor()
+        shards = _shard_sizes(num_races, ODDS_SHARD_RACES)
+        # One substream per shard: a fixed seed gives the same odds however the pool schedules them
+        streams = self.streams.spawn(len(shards))
+        return [
+            executor.submit(_simulate_shard, min_speeds, max_speeds, count, self.race_distance, self.dt, stream.seed_sequence)
+            for count, stream in zip(shards, streams)
+        ]
+
+    def _collect(self, key, futures, num_races):
+        counts = sum(future.result() for future in futures)
+        odds = LineupOdds(counts, num_races)
+        self._cache[key] = odds
+        self._pending.pop(key, None)
+        logging.info(f"Odds ready for {len(counts)}-racer lineup ({num_races} races)")
+        return odds
+
+    def get(self, sprotos, num_races=None):
+        # Non-blocking: returns cached odds, or None while the pool is still working
+        if not sprotos:
+            return None
+        num_races = num_races or self.num_races
+        key = self.lineup_key(sprotos, num_races)
+        if key in self._cache:
+            return self._cache[key]
+        futures = self._pending.get(key)
+        if futures is None:
+            try:
+                self._pending[key] = self._submit(sprotos, num_races)
+            except Exception as e:
+                logging.error(f"Failed to start odds simulation: {e}")
+                self._cache[key] = None
+            return None
+        if all(future.done() for future in futures):
+            try:
+                return self._collect(key, futures, num_races)
+            except Exception as e:
+                logging.error(f"Odds simulation failed: {e}")
+                self._cache[key] = None
+                self._pending.pop(key, None)
+        return None
+
+    def compute(self, sprotos, num_races=None):
+        num_races = num_races or self.num_races
+        key = self.lineup_key(sprotos, num_races)
+        if key in self._cache:
+            return self._cache[key]
+        futures = self._pending.get(key) or self._submit(sprotos, num_races)
+        self._pending[key] = futures
+        return self._collect(key, futures, num_races)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
+
+# Seeded from the game's streams, so RANDOM_SEED makes the odds panel reproducible too
+odds_service = OddsService(seed=game_streams.spawn(1)[0].seed_sequence)
@@ -0,0 +1,203 @@
+import numpy as np
+from settings import RACE_DISTANCE, SIMULATION_DT
+from sproto import get_reroll_chance
+
+# Stand-in tick count for "never" (a stopped racer, or no re-rolls at all)
+NEVER = np.iinfo(np.int64).max // 4
+NO_LANES = np.zeros(0, dtype=np.int64)
+
+def _resolve_events(rng, positions, speeds, min_speeds, max_speeds, race_distance, dt, chance, horizon=None):
+    # Speed is piecewise-constant between re-rolls, and re-rolls are independent per tick,
+    # so the gap to the next one is geometric. Jump from re-roll to re-roll and solve the
+    # finishing tick of the last segment in closed form: O(speed changes), not O(ticks).
+    # Returns ticks until each racer finishes (-1 if not within horizon), plus final positions and speeds.
+    count = len(positions)
+    positions = np.array(positions, dtype=np.float64)
+    speeds = np.array(speeds, dtype=np.float64)
+    finish_ticks = np.full(count, -1, dtype=np.int64)
+    elapsed = np.zeros(count, dtype=np.int64)
+    active = np.arange(count)
+    while len(active):
+        step = speeds[active] * dt
+        remaining = race_distance - positions[active]
+        needed = np.full(len(active), NEVER, dtype=np.int64)
+        moving = step > 0
+        needed[moving] = np.maximum(np.ceil(remaining[moving] / step[moving]), 1)
+        # ceil can land a tick late when the division rounds up past a whole number
+        needed -= moving & (needed > 1) & ((needed - 1) * step >= remaining)
+        if chance > 0:
+            gaps = rng.geometric(chance, size=len(active))
+        else:
+            gaps = np.minimum(needed, NEVER - 1) + 1
+        ticks_left = NEVER if horizon is None else horizon - elapsed[active]
+
+        done = (needed <= gaps) & (needed <= ticks_left)
+        lanes = active[done]
+        finish_ticks[lanes] = elapsed[lanes] + needed[done]
+        positions[lanes] = race_distance
+        # The re-roll on the finishing tick still happens
+        rerolled = lanes[gaps[done] == needed[done]]
+        speeds[rerolled] = rng.uniform(min_speeds[rerolled], max_speeds[rerolled])
+
+        # Out of time before the next re-roll: memorylessness lets us drop the unused gap
+        stopped = ~done & (gaps > ticks_left)
+        lanes = active[stopped]
+        positions[lanes] += (ticks_left if horizon is None else ticks_left[stopped]) * step[stopped]
+
+        carry_on = ~done & ~stopped
+        lanes = active[carry_on]
+        positions[lanes] += gaps[carry_on] * step[carry_on]
+        elapsed[lanes] += gaps[carry_on]
+        speeds[lanes] = rng.uniform(min_speeds[lanes], max_speeds[lanes])
+        active = lanes
+    return finish_ticks, positions, speeds
+
+# Headless race engine: same rules as Sproto.run, but every racer is advanced
+# at once with NumPy arrays and nothing is drawn.
+class RaceEngine:
+    def __init__(self, min_speeds, max_speeds, race_distance=RACE_DISTANCE, dt=SIMULATION_DT, rng=None, speeds=None):
+        self.min_speeds = np.asarray(min_speeds, dtype=np.float64)
+        self.max_speeds = np.asarray(max_speeds, dtype=np.float64)
+        self.num_racers = len(self.min_speeds)
+        self.race_distance = race_distance
+        self.dt = dt
+        self.reroll_chance = get_reroll_chance(dt)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.reset(speeds)
+
+    @classmethod
+    def from_sprotos(cls, sprotos, race_distance=RACE_DISTANCE, dt=SIMULATION_DT, rng=None):
+        return cls(
+            [s.min_speed for s in sprotos],
+            [s.max_speed for s in sprotos],
+            race_distance=race_distance,
+            dt=dt,
+            rng=rng,
+            speeds=[s.current_speed for s in sprotos]
+        )
+
+    def reset(self, speeds=None):
+        self.tick = 0
+        self.positions = np.zeros(self.num_racers)
+        self.previous_positions = np.zeros(self.num_racers)  # Before the last step(), for interpolation
+        if speeds is None:
+            self.speeds = self.rng.uniform(self.min_speeds, self.max_speeds)
+        else:
+            self.speeds = np.array(speeds, dtype=np.float64)
+        self.finished = np.zeros(self.num_racers, dtype=bool)
+        self.finish_ticks = np.zeros(self.num_racers, dtype=np.int64)
+        self.finish_places = np.zeros(self.num_racers, dtype=np.int64)  # 0 = still running
+        self.num_finished = 0
+        self.last_finishers = NO_LANES  # Lanes that finished in the last step(), in place order
+
+    @property
+    def race_finished(self):
+        return self.num_finished == self.num_racers
+
+    @property
+    def time_elapsed(self):
+        return self.tick * self.dt
+
+    @property
+    def start_time(self):
+        # Sproto.run stamps start_time with the clock after the first tick
+        return self.dt if self.tick else 0
+
+    @property
+    def finish_times(self):
+        return np.where(self.finished, self.finish_ticks * self.dt, 0.0)
+
+    def average_speeds(self):
+        duration = self.finish_times - self.start_time
+        valid = self.finished & (duration > 0)
+        return np.where(valid, self.positions / np.where(valid, duration, 1.0), 0.0)
+
+    def finish_order(self):
+        finished_lanes = np.flatnonzero(self.finished)
+        return finished_lanes[np.argsort(self.finish_places[finished_lanes], kind="stable")]
+
+    def _record_finishers(self, lanes, ticks):
+        # Same tick finishers are placed in lane order, like the frame loop does
+        order = np.lexsort((lanes, ticks))
+        lanes = lanes[order]
+        self.finished[lanes] = True
+        self.positions[lanes] = self.race_distance
+        self.finish_ticks[lanes] = ticks[order]
+        self.finish_places[lanes] = np.arange(self.num_finished + 1, self.num_finished + 1 + len(lanes))
+        self.num_finished += len(lanes)
+        self.last_finishers = lanes
+
+    def step(self):
+        if self.race_finished:
+            return
+        self.tick += 1
+        self.last_finishers = NO_LANES
+        self.previous_positions[:] = self.positions
+        active = ~self.finished
+        self.positions += np.where(active, self.speeds * self.dt, 0.0)
+        crossed = np.flatnonzero(active & (self.positions >= self.race_distance))
+        if len(crossed):
+            self._record_finishers(crossed, np.full(len(crossed), self.tick))
+        rerolls = np.flatnonzero(active & (self.rng.random(self.num_racers) < self.reroll_chance))
+        if len(rerolls):
+            self.speeds[rerolls] = self.rng.uniform(self.min_speeds[rerolls], self.max_speeds[rerolls])
+
+    def run(self, max_ticks=None):
+        lanes = np.flatnonzero(~self.finished)
+        horizon = None if max_ticks is None else max_ticks - self.tick
+        if len(lanes) == 0 or (horizon is not None and horizon <= 0):
+            return self.finish_order()
+        finish_ticks, positions, speeds = _resolve_events(
+            self.rng, self.positions[lanes], self.speeds[lanes], self.min_speeds[lanes], self.max_speeds[lanes],
+            self.race_distance, self.dt, self.reroll_chance, horizon
+        )
+        self.positions[lanes] = positions
+        self.speeds[lanes] = speeds
+        done = finish_ticks > 0
+        if done.any():
+            self._record_finishers(lanes[done], self.tick + finish_ticks[done])
+        self.tick += int(finish_ticks.max()) if done.all() else horizon
+        return self.finish_order()
+
+    def apply_to_sprotos(self, sprotos):
+        finish_times = self.finish_times
+        for i, sproto in enumerate(sprotos):
+            sproto.position = float(self.positions[i])
+            sproto.current_speed = float(self.speeds[i])
+            sproto.finished = bool(self.finished[i])
+            sproto.start_time = self.start_time
+            sproto.finish_time = float(finish_times[i])
+            sproto.finish_place = int(self.finish_places[i]) if self.finished[i] else None
+        finishers = [sprotos[i] for i in self.finish_order()]
+        if self.race_finished:
+            for sproto in sprotos:
+                sproto.tournament_speeds.append(sproto.get_average_speed())
+        return finishers
+
+def simulate_race_headless(sprotos, race_distance=RACE_DISTANCE, dt=SIMULATION_DT, rng=None):
+    engine = RaceEngine.from_sprotos(sprotos, race_distance=race_distance, dt=dt, rng=rng)
+    engine.run()
+    finishers = engine.apply_to_sprotos(sprotos)
+    winner = finishers[0] if finishers else max(sprotos, key=lambda s: s.position)
+    return winner, finishers
+
+def simulate_race_batch(min_speeds, max_speeds, num_races, race_distance=RACE_DISTANCE, dt=SIMULATION_DT, rng=None):
+    # Returns places[race, lane] for num_races independent races of the same lineup
+    min_speeds = np.asarray(min_speeds, dtype=np.float64)
+    max_speeds = np.asarray(max_speeds, dtype=np.float64)
+    if min_speeds.min() <= 0:
+        raise ValueError("simulate_race_batch needs positive minimum speeds so every race ends")
+    rng = rng if rng is not None else np.random.default_rng()
+    num_racers = len(min_speeds)
+    col_min = np.tile(min_speeds, num_races)
+    col_max = np.tile(max_speeds, num_races)
+    finish_ticks, _, _ = _resolve_events(
+        rng, np.zeros(len(col_min)), rng.uniform(col_min, col_max), col_min, col_max,
+        race_distance, dt, get_reroll_chance(dt)
+    )
+    finish_ticks = finish_ticks.reshape(num_races, num_racers)
+    # Ties on the same tick go to the lower lane, as in the frame loop
+    order = np.argsort(finish_ticks * num_racers + np.arange(num_racers), axis=1, kind="stable")
+    places = np.empty_like(order)
+    np.put_along_axis(places, order, np.arange(1, num_racers + 1)[None, :], axis=1)
+    return places
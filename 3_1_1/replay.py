@@ -0,0 +1,136 @@
+import logging
+import pygame
+from settings import *
+from ui import *
+from screens import render_race_screen
+from sproto import Sproto
+from telemetry import RaceTelemetry
+from frame_scheduler import FrameScheduler
+
+# Plays a recorded race back through render_race_screen. Nothing is re-simulated: each
+# frame looks up its tick in the telemetry with a binary search and draws between that
+# tick and the next, so seeking anywhere costs the same as playing forward.
+
+def _replay_sprotos(sprotos):
+    # Stand-ins carrying the racers' looks and lanes; positions come from the recording
+    replay_sprotos = []
+    for sproto in sprotos:
+        copy = Sproto(sproto.name, 0, sproto.lane, sproto.sprite)
+        copy.min_speed = sproto.min_speed
+        copy.max_speed = sproto.max_speed
+        replay_sprotos.append(copy)
+    return replay_sprotos
+
+def _apply_tick(replay_sprotos, places, telemetry, row, next_row):
+    for i, sproto in enumerate(replay_sprotos):
+        sproto.previous_position = float(telemetry.positions[row, i])
+        sproto.position = float(telemetry.positions[next_row, i])
+        sproto.current_speed = float(telemetry.speeds[next_row, i])
+        sproto.finished = bool(telemetry.finished[row, i])
+        sproto.finish_place = places[i] if sproto.finished else None
+
+def play_replay(screen, telemetry_path, sprotos, race_distance, race_layer, winner, is_muted, lane_height=100):
+    # Returns (keep_running, is_muted); keep_running is False if the window was closed
+    try:
+        telemetry = RaceTelemetry(telemetry_path)
+    except (OSError, ValueError) as e:
+        logging.error(f"Could not open race replay '{telemetry_path}': {e}")
+        return True, is_muted
+    if len(telemetry) == 0 or telemetry.count != len(sprotos):
+        logging.error(f"Race replay '{telemetry_path}' does not match this race")
+        return True, is_muted
+
+    replay_sprotos = _replay_sprotos(sprotos)
+    places = [sproto.finish_place for sproto in sprotos]
+    start, end = float(telemetry.times[0]), float(telemetry.times[-1])
+    photo_finish_time = max(start, winner.finish_time - 2.0) if winner is not None and winner.finish_time else None
+    replay_time = start
+    speed_index = REPLAY_SPEEDS.index(1)
+    paused = False
+    scrubbing = False
+
+    button_width = 160
+    button_y = SCREEN_HEIGHT - 95
+    button_x = (SCREEN_WIDTH - 5 * button_width - 4 * 15) // 2
+    slower_button = Button("<< Slower", button_x, button_y, button_width, 36, BLUE)
+    pause_button = Button("Pause", button_x + (button_width + 15), button_y, button_width, 36, BLUE)
+    faster_button = Button("Faster >>", button_x + 2 * (button_width + 15), button_y, button_width, 36, BLUE)
+    photo_button = Button("Photo Finish", button_x + 3 * (button_width + 15), button_y, button_width, 36, RED)
+    exit_button = Button("Exit Replay", button_x + 4 * (button_width + 15), button_y, button_width, 36, ORANGE)
+    mute_button = MuteButton(SCREEN_WIDTH - 75, 10, 50, 20, GRAY)
+    buttons = [slower_button, pause_button, faster_button, exit_button, mute_button]
+    if photo_finish_time is not None:
+        buttons.insert(3, photo_button)
+    bar_rect = pygame.Rect(100, SCREEN_HEIGHT - 40, SCREEN_WIDTH - 200, 14)
+
+    def time_at(x):
+        return start + (end - start) * min(max((x - bar_rect.x) / bar_rect.width, 0.0), 1.0)
+
+    logging.info(f"Replaying race from '{telemetry_path}' ({len(telemetry)} ticks)")
+    frames = FrameScheduler()
+    while True:
+        dt, events = frames.next_frame(animating=not paused)
+        # A paused frame's dt includes the idle wait for input; it must not be played back
+        was_paused = paused
+        for event in events:
+            if event.type == pygame.QUIT:
+                return False, is_muted
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return True, is_muted
+                if event.key == pygame.K_SPACE:
+                    if paused and replay_time >= end:
+                        replay_time = start
+                    paused = not paused
+                elif event.key == pygame.K_LEFT:
+                    replay_time = max(start, replay_time - REPLAY_SEEK_STEP)
+                elif event.key == pygame.K_RIGHT:
+                    replay_time = min(end, replay_time + REPLAY_SEEK_STEP)
+                elif event.key == pygame.K_UP:
+                    speed_index = min(speed_index + 1, len(REPLAY_SPEEDS) - 1)
+                elif event.key == pygame.K_DOWN:
+                    speed_index = max(speed_index - 1, 0)
+            _, is_muted = mute_button.is_clicked(event, is_muted, RACE_MUSIC_PATH)
+            if exit_button.is_clicked(event):
+                return True, is_muted
+            if slower_button.is_clicked(event):
+                speed_index = max(speed_index - 1, 0)
+            if faster_button.is_clicked(event):
+                speed_index = min(speed_index + 1, len(REPLAY_SPEEDS) - 1)
+            if pause_button.is_clicked(event):
+                if paused and replay_time >= end:
+                    replay_time = start  # Play again from the start
+                paused = not paused
+            if photo_finish_time is not None and photo_button.is_clicked(event):
+                replay_time = photo_finish_time
+                speed_index = 0
+                paused = False
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and bar_rect.inflate(0, 16).collidepoint(event.pos):
+                scrubbing = True
+                replay_time = time_at(event.pos[0])
+            elif event.type == pygame.MOUSEMOTION and scrubbing:
+                replay_time = time_at(event.pos[0])
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                scrubbing = False
+
+        if not paused and not scrubbing and not was_paused:
+            replay_time += dt * REPLAY_SPEEDS[speed_index]
+            if replay_time >= end:
+                replay_time = end
+                paused = True
+                frames.invalidate()
+        pause_button.text = "Play" if paused else "Pause"
+
+        if frames.dirty:
+            row, fraction = telemetry.locate(replay_time)
+            _apply_tick(replay_sprotos, places, telemetry, row, min(row + 1, len(telemetry) - 1))
+            shown_winner = winner if replay_time >= end else None
+            render_race_screen(screen, replay_sprotos, race_distance, replay_time, None, shown_winner, race_layer, buttons, 0, is_muted, lane_height=lane_height, interpolation=fraction)
+            draw_text_with_shadow(screen, f"Replay {REPLAY_SPEEDS[speed_index]:g}x", font, YELLOW, (20, SCREEN_HEIGHT - 140))
+            pygame.draw.rect(screen, BLACK, bar_rect)
+            filled = bar_rect.copy()
+            filled.width = int(bar_rect.width * (replay_time - start) / max(end - start, 1e-9))
+            pygame.draw.rect(screen, YELLOW, filled)
+            pygame.draw.rect(screen, WHITE, bar_rect, 2)
+            pygame.display.flip()
+            frames.presented()
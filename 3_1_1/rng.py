@@ -0,0 +1,41 @@
+import random
+import logging
+import numpy as np
+from settings import RANDOM_SEED
+
+# Seedable random streams. Every race, tournament and fight draws from its own
+# generator, and worker processes get spawned substreams, so batch runs are
+# reproducible and shards never share (or correlate) draws.
+class RandomStreams:
+    def __init__(self, seed=None):
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+
+    @property
+    def seed(self):
+        return self.seed_sequence.entropy
+
+    def spawn(self, count):
+        return [RandomStreams(child) for child in self.seed_sequence.spawn(count)]
+
+    def _next_child(self):
+        return self.seed_sequence.spawn(1)[0]
+
+    def python_random(self):
+        # random.Random wants an int seed, so fold 128 bits of child state into one
+        state = self._next_child().generate_state(4, np.uint32)
+        return random.Random(int.from_bytes(state.tobytes(), "little"))
+
+    def numpy_generator(self):
+        return np.random.default_rng(self._next_child())
+
+    def race(self):
+        return self.python_random()
+
+    def fight(self):
+        return self.python_random()
+
+game_streams = RandomStreams(RANDOM_SEED)
+logging.info(f"Random streams seeded with {game_streams.seed}")
@@ -0,0 +1,226 @@
+import numpy as np
+from settings import MEGA_LEADER_POOL
+from sproto import Sproto
+from sprite_cache import get_sprite_variant
+
+# Structure-of-arrays roster: one NumPy array per racer field instead of a dozen
+# attributes on every Sproto. RosterSproto views keep the Sproto API for the results
+# screens; anything stepped every tick should use RaceEngine and apply_race instead.
+class Roster:
+    def __init__(self, names, images, small_sprites=None):
+        count = len(names)
+        self.names = list(names)
+        self.images = list(images)
+        # Scaled on first use, most racers never need one
+        self.small_sprites = list(small_sprites) if small_sprites is not None else [None] * count
+        self.position = np.zeros(count)
+        self.previous_position = np.zeros(count)
+        self.lane = np.arange(count, dtype=np.int64)
+        self.current_speed = np.zeros(count)
+        self.min_speed = np.zeros(count)
+        self.max_speed = np.zeros(count)
+        self.finished = np.zeros(count, dtype=bool)
+        self.start_time = np.zeros(count)
+        self.finish_time = np.zeros(count)
+        self.finish_place = np.zeros(count, dtype=np.int64)  # 0 = not placed
+        # Tournament speeds are only ever averaged, so keep a running sum instead of a list
+        self.tournament_speed_sum = np.zeros(count)
+        self.tournament_speed_count = np.zeros(count, dtype=np.int64)
+        self.tournament_wins = np.zeros(count, dtype=np.int64)
+        self.tournament_points = np.zeros(count, dtype=np.int64)
+        # One view per racer, so identity checks like `sproto in finishers` keep working
+        self._views = [RosterSproto(self, i) for i in range(count)]
+
+    def __len__(self):
+        return len(self._views)
+
+    def __getitem__(self, index):
+        return self._views[index]
+
+    def __iter__(self):
+        return iter(self._views)
+
+    def sprotos(self, indices=None):
+        if indices is None:
+            return list(self._views)
+        return [self._views[i] for i in indices]
+
+    def get_small_sprite(self, index):
+        if self.small_sprites[index] is None:
+            self.small_sprites[index] = get_sprite_variant(self.images[index], 23)
+        return self.small_sprites[index]
+
+    def set_speeds(self, indices, min_speed, max_speed, rng):
+        self.min_speed[indices] = min_speed
+        self.max_speed[indices] = max_speed
+        self.current_speed[indices] = rng.uniform(min_speed, max_speed, size=len(indices))
+
+    def reset(self, indices, rng):
+        self.position[indices] = 0
+        self.previous_position[indices] = 0
+        self.current_speed[indices] = rng.uniform(self.min_speed[indices], self.max_speed[indices])
+        self.finished[indices] = False
+        self.start_time[indices] = 0
+        self.finish_time[indices] = 0
+        self.finish_place[indices] = 0
+
+    def reset_tournament(self, indices):
+        self.tournament_speed_sum[indices] = 0
+        self.tournament_speed_count[indices] = 0
+        self.tournament_wins[indices] = 0
+        self.tournament_points[indices] = 0
+
+    def apply_race(self, engine, lanes=slice(None)):
+        # Vectorized RaceEngine.apply_to_sprotos for fields too big to walk racer by racer.
+        # During the race only the lanes on screen are mirrored (a slice), once a frame.
+        finished = engine.finished[lanes]
+        self.position[lanes] = engine.positions[lanes]
+        self.previous_position[lanes] = engine.previous_positions[lanes]
+        self.current_speed[lanes] = engine.speeds[lanes]
+        self.finished[lanes] = finished
+        self.start_time[lanes] = engine.start_time
+        self.finish_time[lanes] = np.where(finished, engine.finish_ticks[lanes] * engine.dt, 0.0)
+        self.finish_place[lanes] = engine.finish_places[lanes]
+
+class LeaderBoard:
+    # The top `count` of a RaceEngine, kept up to date without sorting the field each frame:
+    # finishers come from the engine's finish events, runners are ranked within a small pool
+    # of the furthest lanes. A lane outside the pool can gain at most the top speed per
+    # second on the pool's cut-off, so the pool is only rebuilt (one argpartition over the
+    # field) once that bound could reach the last runner on the board.
+    def __init__(self, engine, count=5, pool_size=MEGA_LEADER_POOL):
+        self.engine = engine
+        self.count = count
+        self.pool_size = max(pool_size, count)
+        self.top_speed = float(engine.max_speeds.max()) if engine.num_racers else 0.0
+        self.finishers = []
+        self.rebuilds = 0
+        self._rebuild()
+
+    @property
+    def final(self):
+        # Once the top spots have all finished the board can't change again
+        return len(self.finishers) >= min(self.count, self.engine.num_racers)
+
+    def record_finishers(self):
+        # Call after every engine step
+        room = self.count - len(self.finishers)
+        if room > 0 and len(self.engine.last_finishers):
+            self.finishers.extend(int(i) for i in self.engine.last_finishers[:room])
+
+    def _rebuild(self):
+        engine = self.engine
+        running = np.flatnonzero(~engine.finished)
+        if len(running) > self.pool_size:
+            distances = -engine.positions[running]
+            split = np.argpartition(distances, self.pool_size)
+            if distances[split[self.pool_size - 1]] == distances[split[self.pool_size]]:
+                # A tie across the cut (the whole field on the line at the start): break it by lane
+                split = np.argsort(distances, kind="stable")
+            # Lane order within the pool, so ties rank by lane as a full sort would
+            self.pool = np.sort(running[split[:self.pool_size]])
+            self.cutoff = float(-distances[split[self.pool_size]])
+        else:
+            self.pool = running
+            self.cutoff = None  # Every runner is in the pool
+        self.built_at = engine.time_elapsed
+        self.rebuilds += 1
+
+    def leaders(self):
+        needed = self.count - len(self.finishers)
+        if needed <= 0:
+            return list(self.finishers)
+        engine = self.engine
+        pool = self.pool[~engine.finished[self.pool]]
+        if self.cutoff is not None:
+            # Furthest an outside lane can have got since the pool was built
+            reach = self.cutoff + self.top_speed * (engine.time_elapsed - self.built_at)
+            if len(pool) < needed or np.partition(-engine.positions[pool], needed - 1)[needed - 1] > -reach:
+                self._rebuild()
+                pool = self.pool
+        front = pool[np.argsort(-engine.positions[pool], kind="stable")[:needed]]
+        return self.finishers + [int(i) for i in front]
+
+def build_mega_roster(sprotos, count):
+    # Reuses the base racers' images (and one scaled copy of each) across the whole field
+    base = len(sprotos)
+    small_sprites = [s.small_sprite for s in sprotos]
+    names = [f"{sprotos[i % base].name} #{i // base + 1}" for i in range(count)]
+    images = [sprotos[i % base].sprite for i in range(count)]
+    return Roster(names, images, small_sprites=[small_sprites[i % base] for i in range(count)])
+
+def _array_field(field, cast):
+    def getter(self):
+        return cast(getattr(self.roster, field)[self.index])
+    def setter(self, value):
+        getattr(self.roster, field)[self.index] = value
+    return property(getter, setter)
+
+class TournamentSpeeds:
+    # Stands in for the old tournament_speeds list: append() and len() only
+    def __init__(self, roster, index):
+        self.roster = roster
+        self.index = index
+
+    def append(self, speed):
+        self.roster.tournament_speed_sum[self.index] += speed
+        self.roster.tournament_speed_count[self.index] += 1
+
+    def __len__(self):
+        return int(self.roster.tournament_speed_count[self.index])
+
+class RosterSproto(Sproto):
+    # A thin view onto one row of the Roster: it holds only the roster and its index, every
+    # field lives in the Roster's arrays. Sproto has no __slots__, so the memory saving
+    # comes from the struct-of-arrays Roster, not from these views.
+
+    def __init__(self, roster, index):
+        self.roster = roster
+        self.index = index
+
+    position = _array_field("position", float)
+    previous_position = _array_field("previous_position", float)
+    lane = _array_field("lane", int)
+    current_speed = _array_field("current_speed", float)
+    min_speed = _array_field("min_speed", float)
+    max_speed = _array_field("max_speed", float)
+    finished = _array_field("finished", bool)
+    start_time = _array_field("start_time", float)
+    finish_time = _array_field("finish_time", float)
+    tournament_wins = _array_field("tournament_wins", int)
+    tournament_points = _array_field("tournament_points", int)
+
+    @property
+    def name(self):
+        return self.roster.names[self.index]
+
+    @property
+    def sprite(self):
+        return self.roster.images[self.index]
+
+    @property
+    def small_sprite(self):
+        return self.roster.get_small_sprite(self.index)
+
+    @property
+    def finish_place(self):
+        place = self.roster.finish_place[self.index]
+        return int(place) if place else None
+
+    @finish_place.setter
+    def finish_place(self, value):
+        self.roster.finish_place[self.index] = value or 0
+
+    @property
+    def tournament_speeds(self):
+        return TournamentSpeeds(self.roster, self.index)
+
+    @tournament_speeds.setter
+    def tournament_speeds(self, speeds):
+        speeds = list(speeds)
+        self.roster.tournament_speed_sum[self.index] = sum(speeds)
+        self.roster.tournament_speed_count[self.index] = len(speeds)
+
+    def get_tournament_avg_speed(self):
+        count = self.roster.tournament_speed_count[self.index]
+        return float(self.roster.tournament_speed_sum[self.index] / count) if count else 0
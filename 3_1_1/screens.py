@@ -1,43 +1,36 @@
 import pygame
 import logging
+from functools import partial
+import numpy as np
 from settings import *
 from ui import *
 from sproto import get_track_position
+from track_geometry import TRACK_PADDING
+from odds import odds_service
+from frame_scheduler import FrameScheduler
+from sprite_cache import get_transformed
 
 # Dynamic tiny_font based on number of racers
 def get_tiny_font(num_sprotos):
     font_size = max(10, min(12, 16 - num_sprotos // 5))  # Scale from 16pt to 10pt
-    return pygame.font.Font(None, font_size)
+    return get_default_font(font_size)
 
-def render_race_screen(screen, sprotos, race_distance, time_elapsed, race_number, winner, track_surface, buttons, current_background, flash_timer, is_muted, lane_height=100):
-    if current_background is not None:
-        screen.blit(current_background, (0, 0))
-    else:
-        screen.fill(BLUE)
+def compose_race_layer(current_background, track_surface, lane_height=100):
+    # Background and lane lines don't change during a race: one opaque surface per race
     track_y = 20 if lane_height < 100 else SCREEN_HEIGHT // 4
-    screen.blit(track_surface, (0, track_y))
+    return compose_static_layer(current_background, [(track_surface, (0, track_y - TRACK_PADDING))])
+
+def render_race_screen(screen, sprotos, race_distance, time_elapsed, race_number, winner, race_layer, buttons, flash_timer, is_muted, lane_height=100, interpolation=1.0):
+    screen.blit(race_layer, (0, 0))
     
     tiny_font = get_tiny_font(len(sprotos))
     
-    if lane_height == 100:  # Single/tournament: curved lanes only
-        for i in range(len(sprotos)):
-            start = (0, track_y + i * lane_height)
-            end = (SCREEN_WIDTH, track_y + i * lane_height)
-            control1 = (SCREEN_WIDTH // 4, track_y + i * lane_height - 50)
-            control2 = (3 * SCREEN_WIDTH // 4, track_y + i * lane_height + 50)
-            points = []
-            for t in range(0, 101, 2):
-                t = t / 100
-                x = (1-t)**3 * start[0] + 3*(1-t)**2*t * control1[0] + 3*(1-t)*t**2 * control2[0] + t**3 * end[0]
-                y = (1-t)**3 * start[1] + 3*(1-t)**2*t * control1[1] + 3*(1-t)*t**2 * control2[1] + t**3 * end[1]
-                points.append((x, y))
-            pygame.draw.lines(screen, YELLOW, False, points, 2)  # Curved lines are now yellow and 2px thick
-    
     leader = max(sprotos, key=lambda s: (s.position, -float('inf') if s.finish_place is None else -s.finish_place))
     
     for i, sproto in enumerate(sprotos):
         adjusted_lane = sproto.lane - 1 if lane_height < 100 else sproto.lane
-        x, y = get_track_position(sproto.position, adjusted_lane, race_distance, lane_height=lane_height)
+        # Draw between the last two physics steps so motion stays smooth at any frame rate
+        x, y = get_track_position(sproto.get_interpolated_position(interpolation), adjusted_lane, race_distance, lane_height=lane_height)
         if lane_height < 100:
             sprite = sproto.small_sprite
             sprite_rect = (x, y - 11.5, 23, 23)
@@ -73,9 +66,9 @@ def render_race_screen(screen, sprotos, race_distance, time_elapsed, race_number
             place_text = f"{sproto.finish_place}{sproto.get_place_suffix()}"
             draw_text_with_shadow(screen, place_text, place_font_small, YELLOW, (x + place_x_offset, y - 11.5 if lane_height < 100 else y - 25))
     
-    timer_text = small_font.render(f"Time: {time_elapsed:.1f} seconds", True, WHITE)
-    timer_x = SCREEN_WIDTH // 2 - timer_text.get_width() // 2
-    draw_text_with_shadow(screen, f"Time: {time_elapsed:.1f} seconds", small_font, WHITE, (timer_x, 10))
+    timer_text = f"Time: {time_elapsed:.1f} seconds"
+    timer_x = SCREEN_WIDTH // 2 - small_font.size(timer_text)[0] // 2
+    draw_text_with_shadow(screen, timer_text, small_font, WHITE, (timer_x, 10))
     
     if race_number:
         text_color = YELLOW if flash_timer < 3.0 and int(flash_timer * 2) % 2 == 0 else WHITE
@@ -118,13 +111,123 @@ def render_race_screen(screen, sprotos, race_distance, time_elapsed, race_number
         else:
             button.draw(screen)
 
+MEGA_TRACK_TOP = 40
+
+def get_mega_view_height():
+    return SCREEN_HEIGHT - MEGA_TRACK_TOP
+
+def get_mega_max_scroll(num_racers):
+    return max(0, num_racers * MEGA_RACE_LANE_HEIGHT - get_mega_view_height())
+
+def get_mega_visible_lanes(scroll_y, num_racers):
+    first = scroll_y // MEGA_RACE_LANE_HEIGHT
+    return first, min(num_racers, (scroll_y + get_mega_view_height()) // MEGA_RACE_LANE_HEIGHT + 1)
+
+def render_mega_race_screen(screen, roster, race_distance, time_elapsed, scroll_y, leaders, winner, buttons, race_layer, is_muted, interpolation=1.0):
+    screen.blit(race_layer, (0, 0))
+    lane_height = MEGA_RACE_LANE_HEIGHT
+    view_height = get_mega_view_height()
+    tiny_font = get_tiny_font(len(roster))
+
+    # Only the lanes inside the viewport are touched, so frame time tracks visible racers
+    first, last = get_mega_visible_lanes(scroll_y, len(roster))
+    previous = roster.previous_position[first:last]
+    current = roster.position[first:last]
+    positions = np.where(roster.finished[first:last], current, previous + (current - previous) * interpolation)
+    xs = positions / race_distance * (SCREEN_WIDTH - 25)
+    speed_ranges = np.maximum(roster.max_speed[first:last] - roster.min_speed[first:last], 1e-9)
+    speed_ratios = np.clip((roster.current_speed[first:last] - roster.min_speed[first:last]) / speed_ranges, 0, 1)
+    leader = leaders[0] if leaders else None
+
+    for offset, index in enumerate(range(first, last)):
+        y = MEGA_TRACK_TOP + index * lane_height - scroll_y
+        x = xs[offset]
+        pygame.draw.line(screen, YELLOW, (0, y + lane_height - 1), (SCREEN_WIDTH, y + lane_height - 1), 1)
+        screen.blit(roster.get_small_sprite(index), (x, y))
+        speed_ratio = speed_ratios[offset]
+        pygame.draw.rect(screen, (255 * speed_ratio, 255 * (1 - speed_ratio), 0), (x, y + lane_height - 3, 23 * speed_ratio, 2))
+        text_color = GOLD if index == leader else WHITE
+        if roster.finished[index]:
+            place = int(roster.finish_place[index])
+            label = f"{roster.names[index]} {place}{roster[index].get_place_suffix()}"
+            draw_text_with_shadow(screen, label, tiny_font, YELLOW, (x - 10 - tiny_font.size(label)[0], y + 6))
+        else:
+            draw_text_with_shadow(screen, roster.names[index], tiny_font, text_color, (x + 28, y + 6), stroke=index == leader)
+
+    # Scrollbar showing where the viewport sits in the field
+    total_height = len(roster) * lane_height
+    if total_height > view_height:
+        bar_height = max(20, view_height * view_height // total_height)
+        bar_y = MEGA_TRACK_TOP + (view_height - bar_height) * scroll_y // get_mega_max_scroll(len(roster))
+        pygame.draw.rect(screen, GRAY, (SCREEN_WIDTH - 8, MEGA_TRACK_TOP, 6, view_height))
+        pygame.draw.rect(screen, WHITE, (SCREEN_WIDTH - 8, bar_y, 6, bar_height))
+
+    timer_text = f"Time: {time_elapsed:.1f} seconds   Lanes {first + 1}-{last} of {len(roster)}"
+    draw_text_with_shadow(screen, timer_text, small_font, WHITE, (SCREEN_WIDTH // 2 - small_font.size(timer_text)[0] // 2, 10))
+
+    if leaders:
+        table_x = 10
+        table_y = 40
+        row_height = 26
+        table_surface = pygame.Surface((260, 34 + row_height * len(leaders)), pygame.SRCALPHA)
+        table_surface.fill((0, 0, 0, 180))
+        screen.blit(table_surface, (table_x, table_y))
+        draw_text_with_shadow(screen, "Leaders", small_font, YELLOW, (table_x + 10, table_y + 5))
+        for i, index in enumerate(leaders):
+            row_y = table_y + 32 + i * row_height
+            screen.blit(roster.get_small_sprite(index), (table_x + 10, row_y))
+            draw_text_with_shadow(screen, f"{i + 1}. {roster.names[index]}", small_font, WHITE, (table_x + 40, row_y))
+
+    if winner:
+        draw_text_with_shadow(screen, f"Winner: {winner.name}!", font, WHITE, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 50))
+    for button in buttons:
+        if isinstance(button, MuteButton):
+            button.draw(screen, is_muted)
+        else:
+            button.draw(screen)
+
+def get_odds_panel_rect(sprotos):
+    if not sprotos:
+        return pygame.Rect(SCREEN_WIDTH - 255, 150, 0, 0)
+    return pygame.Rect(SCREEN_WIDTH - 255, 150, 245, 40 + 26 * len(sprotos))
+
+def draw_odds_panel(screen, sprotos, odds):
+    if not sprotos:
+        return
+    panel_x = SCREEN_WIDTH - 255
+    panel_y = 150
+    row_height = 26
+    panel_surface = pygame.Surface((245, 40 + row_height * len(sprotos)), pygame.SRCALPHA)
+    panel_surface.fill((0, 0, 0, 180))
+    screen.blit(panel_surface, (panel_x, panel_y))
+    draw_text_with_shadow(screen, "Odds", small_font, YELLOW, (panel_x + 10, panel_y + 8))
+    draw_text_with_shadow(screen, "Win", small_font, YELLOW, (panel_x + 125, panel_y + 8))
+    draw_text_with_shadow(screen, "Top 3", small_font, YELLOW, (panel_x + 185, panel_y + 8))
+    for i, sproto in enumerate(sprotos):
+        row_y = panel_y + 36 + i * row_height
+        draw_text_with_shadow(screen, sproto.name, small_font, WHITE, (panel_x + 10, row_y))
+        if odds is not None:
+            draw_text_with_shadow(screen, f"{odds.win[i] * 100:.0f}%", small_font, WHITE, (panel_x + 125, row_y))
+            draw_text_with_shadow(screen, f"{odds.podium[i] * 100:.0f}%", small_font, WHITE, (panel_x + 185, row_y))
+        else:
+            draw_text_with_shadow(screen, "...", small_font, WHITE, (panel_x + 125, row_y))
+
+def draw_selection_cell(screen, sproto, rect, color, text_color):
+    pygame.draw.rect(screen, color, rect)
+    image_x = rect.x + 10
+    image_y = rect.y + (rect.height - 50) // 2
+    if sproto.name in ["Oggo", "BigSwole", "GPM"]:
+        pygame.draw.rect(screen, GREEN, (image_x, image_y, 50, 50), 2)
+    screen.blit(sproto.sprite, (image_x, image_y))
+    draw_text_with_shadow(screen, f"{sproto.name}", selection_font, text_color, (image_x + 50, rect.y + (rect.height - 24) // 2))
+
 def select_sprotos(screen, sproto_list, max_selections, selection_background, is_muted):
     selected_sprotos = []
     running = True
 
     BUTTON_WIDTH = 260
     BUTTON_HEIGHT = 50
-    BUTTON_SPACING_X = 40
+    BUTTON_SPACING_X = 20
     BUTTON_SPACING_Y = 30
 
     cols = 3
@@ -136,22 +239,23 @@ def select_sprotos(screen, sproto_list, max_selections, selection_background, is
     table_x = (SCREEN_WIDTH - table_width) // 2
     table_y = 100
 
-    # --- 3x2 grid for 6 main buttons at the bottom ---
+    # --- 4x2 grid for 7 main buttons at the bottom ---
     buttons_grid_y = SCREEN_HEIGHT - BUTTON_HEIGHT * 2 - BUTTON_SPACING_Y - 40
-    buttons_grid_x = (SCREEN_WIDTH - (BUTTON_WIDTH * 3 + BUTTON_SPACING_X * 2)) // 2
+    buttons_grid_x = (SCREEN_WIDTH - (BUTTON_WIDTH * 4 + BUTTON_SPACING_X * 3)) // 2
 
     button_defs = [
         ("Start Race", BLUE_BUTTON),
         ("Tourney", PURPLE),
         ("All Characters Race", GREEN),
+        ("Mega Race", BRONZE),
         ("Pocket Sprotos", ORANGE),
         ("Cheese Mode", YELLOW),
         ("End Game", RED),
     ]
     buttons = []
     for i, (label, color) in enumerate(button_defs):
-        col = i % 3
-        row = i // 3
+        col = i % 4
+        row = i // 4
         x = buttons_grid_x + col * (BUTTON_WIDTH + BUTTON_SPACING_X)
         y = buttons_grid_y + row * (BUTTON_HEIGHT + BUTTON_SPACING_Y)
         btn = Button(label, x, y, BUTTON_WIDTH, BUTTON_HEIGHT, color)
@@ -161,12 +265,14 @@ def select_sprotos(screen, sproto_list, max_selections, selection_background, is
         buttons.append(btn)
 
     # Button mapping for event logic
-    start_button, tourney_button, all_race_button, pocket_button, cheese_button, end_game_button = buttons
+    start_button, tourney_button, all_race_button, mega_race_button, pocket_button, cheese_button, end_game_button = buttons
     mute_button = MuteButton(SCREEN_WIDTH - 75, 10, 50, 20, GRAY)
 
-    logging.info("Sprotos available in selection screen:")
-    for sproto in sproto_list:
-        logging.info(f"- {sproto.name}")
+    roster_log = logging.getLogger("selection.roster")
+    if roster_log.isEnabledFor(logging.INFO):
+        roster_log.info("Sprotos available in selection screen:")
+        for sproto in sproto_list:
+            roster_log.info(f"- {sproto.name}")
 
     pygame.mixer.music.stop()
     if os.path.exists(SELECTION_MUSIC_PATH):
@@ -193,7 +299,22 @@ def select_sprotos(screen, sproto_list, max_selections, selection_background, is
         pygame.display.flip()
         pygame.time.wait(2000)
 
+    # Everything that never changes on this screen goes into the base layer
+    base = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    if selection_background is not None:
+        base.blit(selection_background, (0, 0))
+    else:
+        base.fill(WHITE)
+    header_rect = pygame.Rect(table_x, table_y, table_width, cell_height)
+    pygame.draw.rect(base, BLACK, header_rect)
+    draw_text_with_shadow(base, f"Select Up to {max_selections} Sprotos", font, WHITE, (table_x + 150, table_y + 15))
+    draw_text_with_shadow(base, "Version 3.1.1", small_font, WHITE, (SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT - 40))
+    draw_text_with_shadow(base, "@coinapache on X", small_font, WHITE, (SCREEN_WIDTH // 2 - 60, SCREEN_HEIGHT - 20))
+    renderer = DirtyRectRenderer(screen, base)
+
+    frames = FrameScheduler()
     while running:
+        _, events = frames.next_frame()
         mouse_pos = pygame.mouse.get_pos()
         hovered_idx = None
         for idx, sproto in enumerate(sproto_list):
@@ -206,7 +327,7 @@ def select_sprotos(screen, sproto_list, max_selections, selection_background, is
                 hovered_idx = idx
                 break
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.mixer.music.stop()
                 logging.info("Selection music stopped.")
@@ -223,6 +344,10 @@ def select_sprotos(screen, sproto_list, max_selections, selection_background, is
                 pygame.mixer.music.stop()
                 logging.info("Selection music stopped.")
                 return sproto_list, False, is_muted, "all_characters"
+            if mega_race_button.is_clicked(event):
+                pygame.mixer.music.stop()
+                logging.info("Selection music stopped.")
+                return None, False, is_muted, "mega_race"
             if pocket_button.is_clicked(event) and len(selected_sprotos) == 2:
                 pygame.mixer.music.stop()
                 logging.info("Selection music stopped.")
@@ -252,18 +377,11 @@ def select_sprotos(screen, sproto_list, max_selections, selection_background, is
                         elif sproto in selected_sprotos:
                             selected_sprotos.remove(sproto)
 
-        if selection_background is not None:
-            screen.blit(selection_background, (0, 0))
-        else:
-            screen.fill(WHITE)
-
-        header_rect = pygame.Rect(table_x, table_y, table_width, cell_height)
-        pygame.draw.rect(screen, BLACK, header_rect)
-        draw_text_with_shadow(screen, f"Select Up to {max_selections} Sprotos", font, WHITE, (table_x + 150, table_y + 15))
-
-        draw_text_with_shadow(screen, "Version 3.1.1", small_font, WHITE, (SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT - 40))
-        draw_text_with_shadow(screen, "@coinapache on X", small_font, WHITE, (SCREEN_WIDTH // 2 - 60, SCREEN_HEIGHT - 20))
+        # Nothing on this screen moves by itself: redraw only after input
+        if not frames.dirty:
+            continue
 
+        widgets = []
         for idx, sproto in enumerate(sproto_list):
             row = idx // cols
             col = idx % cols
@@ -279,29 +397,31 @@ def select_sprotos(screen, sproto_list, max_selections, selection_background, is
             else:
                 color = BLACK
                 text_color = WHITE
-            pygame.draw.rect(screen, color, rect)
-            image_x = cell_x + 10
-            image_y = cell_y + (cell_height - 50) // 2
-            if sproto.name in ["Oggo", "BigSwole", "GPM"]:
-                pygame.draw.rect(screen, GREEN, (image_x, image_y, 50, 50), 2)
-            screen.blit(sproto.sprite, (image_x, image_y))
-            draw_text_with_shadow(screen, f"{sproto.name}", selection_font, text_color, (image_x + 50, cell_y + (cell_height - 24) // 2))
-
-        draw_text_with_shadow(screen, f"Selected: {len(selected_sprotos)}/{max_selections}", font, WHITE, (SCREEN_WIDTH // 2 - 80, 620))
-        # Draw all 6 main buttons in 3x2 grid
-        for btn in buttons:
-            btn.draw(screen)
-        mute_button.draw(screen, is_muted)
-        pygame.display.flip()
+            # Long names run past the cell, so the label is part of the widget's area
+            label_rect = get_text_surface(sproto.name, selection_font, text_color).get_rect(topleft=(cell_x + 60, cell_y + (cell_height - 24) // 2))
+            widgets.append((("cell", idx), rect.union(label_rect), (color, text_color), partial(draw_selection_cell, screen, sproto, rect, color, text_color)))
+
+        selected_text = f"Selected: {len(selected_sprotos)}/{max_selections}"
+        selected_pos = (SCREEN_WIDTH // 2 - 80, 620)
+        widgets.append(("selected", get_text_surface(selected_text, font, WHITE).get_rect(topleft=selected_pos), selected_text, partial(draw_text_with_shadow, screen, selected_text, font, WHITE, selected_pos)))
+        odds = odds_service.get(selected_sprotos)
+        widgets.append(("odds", get_odds_panel_rect(selected_sprotos), (tuple(selected_sprotos), odds), partial(draw_odds_panel, screen, list(selected_sprotos), odds)))
+        if selected_sprotos and odds is None:
+            frames.wake_in(100)  # Check back for the odds
+        # All 7 main buttons in a 4x2 grid
+        for idx, btn in enumerate(buttons):
+            widgets.append((("button", idx), btn.rect, btn.rect.collidepoint(mouse_pos), partial(btn.draw, screen)))
+        widgets.append(("mute", mute_button.rect, (mute_button.rect.collidepoint(mouse_pos), is_muted), partial(mute_button.draw, screen, is_muted)))
+        renderer.render(widgets)
+        frames.presented()
     pygame.mixer.music.stop()
     logging.info("Selection music stopped.")
     return None, False, is_muted, None
 
 def show_results_screen(screen, sprotos, finishers, race_backgrounds, trophy_image, is_muted):
     running = True
-    clock = pygame.time.Clock()
+    frames = FrameScheduler(ANIMATION_FRAME_RATE)
     sorted_sprotos = sorted(sprotos, key=lambda h: finishers.index(h) if h in finishers else len(finishers))
-    black_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
     continue_button = Button("Continue", SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT - 100, 200, 50, GREEN)
     mute_button = MuteButton(SCREEN_WIDTH - 75, 10, 50, 20, GRAY)
     marquee_text = MARQUEE_TEXT
@@ -336,43 +456,21 @@ def show_results_screen(screen, sprotos, finishers, race_backgrounds, trophy_ima
         logging.error("Results background is missing. Ensure the file path is correct.")
         return False, is_muted
 
-    while running:
-        dt = clock.tick(60) / 1000.0
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False, is_muted
-            if continue_button.is_clicked(event):
-                running = False
-            clicked, is_muted = mute_button.is_clicked(event, is_muted, RACE_MUSIC_PATH)
-            if clicked:
-                pass
-            if event.type == pygame.MOUSEWHEEL:
-                scroll_offset -= event.y * 30
-                scroll_offset = max(0, min(scroll_offset, max(0, table_height - max_visible_rows * cell_height)))
-
-        marquee_x -= 100 * dt
-        if marquee_x < -marquee_width:
-            marquee_x = SCREEN_WIDTH
-
-        if race_backgrounds["results"] is not None:
-            screen.blit(race_backgrounds["results"], (0, 0))
-        else:
-            screen.fill(BLUE)
-
-        black_surface.fill((0, 0, 0, 180))
-        visible_height = min(table_height, max_visible_rows * cell_height + 60)
-        pygame.draw.rect(black_surface, (0, 0, 0, 180), (table_x - 10, table_y - 30, table_width + 20, visible_height))
-        screen.blit(black_surface, (0, 0))
-        black_surface.fill((0, 0, 0, 0))
-
-        draw_text_with_shadow(screen, "Race Results", font, WHITE, (SCREEN_WIDTH // 2 - 80, 60))
-
-        headers = ["Racer", "Place", "Avg Speed"]
-        for col, header in enumerate(headers):
-            cell_x = table_x + col * cell_width
-            draw_text_with_shadow(screen, header, small_font, YELLOW, (cell_x + cell_width // 2 - 30, table_y - 20))
-            pygame.draw.rect(screen, WHITE, (cell_x, table_y - 30, cell_width, 30), 1)
-
+    # Background, dimming, title and headers never change: they go into the base layer
+    dim_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+    dim_surface.fill((0, 0, 0, 180))
+    base = compose_static_layer(race_backgrounds["results"], [(dim_surface, (0, 0))])
+    draw_text_with_shadow(base, "Race Results", font, WHITE, (SCREEN_WIDTH // 2 - 80, 60))
+    headers = ["Racer", "Place", "Avg Speed"]
+    for col, header in enumerate(headers):
+        cell_x = table_x + col * cell_width
+        draw_text_with_shadow(base, header, small_font, YELLOW, (cell_x + cell_width // 2 - 30, table_y - 20))
+        pygame.draw.rect(base, WHITE, (cell_x, table_y - 30, cell_width, 30), 1)
+    renderer = DirtyRectRenderer(screen, base)
+    marquee_surface = get_text_surface(marquee_text, small_font, WHITE)
+    rows_rect = pygame.Rect(table_x, table_y, num_cols * cell_width, max_visible_rows * cell_height)
+
+    def draw_rows():
         start_row = scroll_offset // cell_height
         end_row = min(start_row + max_visible_rows, len(sorted_sprotos))
         for row in range(start_row, end_row):
@@ -388,9 +486,8 @@ def show_results_screen(screen, sprotos, finishers, race_backgrounds, trophy_ima
                     if border_color:
                         pygame.draw.rect(screen, border_color, (image_x - 3, image_y - 3, 56, 56), 3)
                     screen.blit(sproto.sprite, (image_x, image_y))
-                    name_text = small_font.render(sproto.name, True, WHITE)
                     name_x = image_x + 60
-                    name_y = cell_y + (cell_height - name_text.get_height()) // 2
+                    name_y = cell_y + (cell_height - small_font.size(sproto.name)[1]) // 2
                     draw_text_with_shadow(screen, sproto.name, small_font, WHITE, (name_x, name_y))
                 elif col == 1:
                     place_text = f"{row + 1}{sproto.get_place_suffix()}"
@@ -399,18 +496,39 @@ def show_results_screen(screen, sprotos, finishers, race_backgrounds, trophy_ima
                     avg_speed = sproto.get_average_speed()
                     draw_text_with_shadow(screen, f"{avg_speed:.2f}", small_font, WHITE, (cell_x + 10, cell_y + (cell_height - 20) // 2))
 
-        draw_text_with_shadow(screen, marquee_text, small_font, WHITE, (marquee_x, marquee_y))
-        continue_button.draw(screen)
-        mute_button.draw(screen, is_muted)
-        pygame.display.flip()
+    while running:
+        dt, events = frames.next_frame(animating=True)
+        for event in events:
+            if event.type == pygame.QUIT:
+                return False, is_muted
+            if continue_button.is_clicked(event):
+                running = False
+            clicked, is_muted = mute_button.is_clicked(event, is_muted, RACE_MUSIC_PATH)
+            if clicked:
+                pass
+            if event.type == pygame.MOUSEWHEEL:
+                scroll_offset -= event.y * 30
+                scroll_offset = max(0, min(scroll_offset, max(0, table_height - max_visible_rows * cell_height)))
+
+        marquee_x -= 100 * dt
+        if marquee_x < -marquee_width:
+            marquee_x = SCREEN_WIDTH
+
+        widgets = [
+            ("rows", rows_rect, scroll_offset, draw_rows),
+            ("marquee", marquee_surface.get_rect(topleft=(int(marquee_x), marquee_y)), None, partial(screen.blit, marquee_surface, (int(marquee_x), marquee_y))),
+            ("continue", continue_button.rect, continue_button.rect.collidepoint(pygame.mouse.get_pos()), partial(continue_button.draw, screen)),
+            ("mute", mute_button.rect, (mute_button.rect.collidepoint(pygame.mouse.get_pos()), is_muted), partial(mute_button.draw, screen, is_muted)),
+        ]
+        renderer.render(widgets)
+        frames.presented()
 
     return True, is_muted
 
 def show_tournament_results(screen, sprotos, race_backgrounds, trophy_image, is_muted):
     running = True
-    clock = pygame.time.Clock()
+    frames = FrameScheduler(ANIMATION_FRAME_RATE)
     sorted_sprotos = sorted(sprotos, key=lambda s: (-s.tournament_wins, -s.get_tournament_avg_speed()))
-    black_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
     continue_button = Button("Continue", SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT - 100, 200, 50, GREEN)
     mute_button = MuteButton(SCREEN_WIDTH - 75, 10, 50, 20, GRAY)
     marquee_text = MARQUEE_TEXT
@@ -444,47 +562,22 @@ def show_tournament_results(screen, sprotos, race_backgrounds, trophy_image, is_
         logging.error("Results background is missing. Ensure the file path is correct.")
         return False, is_muted
 
-    while running:
-        dt = clock.tick(60) / 1000.0
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.mixer.music.stop()
-                logging.info("Tournament music stopped (quit).")
-                return False, is_muted
-            if continue_button.is_clicked(event):
-                pygame.mixer.music.stop()
-                logging.info("Tournament music stopped (continue).")
-                running = False
-            clicked, is_muted = mute_button.is_clicked(event, is_muted, RACE_MUSIC_PATH)
-            if clicked:
-                pass
-            if event.type == pygame.MOUSEWHEEL:
-                scroll_offset -= event.y * 30
-                scroll_offset = max(0, min(scroll_offset, max(0, table_height - max_visible_rows * cell_height)))
-
-        marquee_x -= 100 * dt
-        if marquee_x < -marquee_width:
-            marquee_x = SCREEN_WIDTH
-
-        if race_backgrounds["results"] is not None:
-            screen.blit(race_backgrounds["results"], (0, 0))
-        else:
-            screen.fill(BLUE)
-
-        black_surface.fill((0, 0, 0, 180))
-        visible_height = min(table_height, max_visible_rows * cell_height + 60)
-        pygame.draw.rect(black_surface, (0, 0, 0, 180), (table_x - 10, table_y - 30, table_width + 20, visible_height))
-        screen.blit(black_surface, (0, 0))
-        black_surface.fill((0, 0, 0, 0))
-
-        draw_text_with_shadow(screen, "Tournament Results", font, WHITE, (SCREEN_WIDTH // 2 - 120, 60))
-
-        headers = ["Racer", "Place", "Points", "Wins", "Avg Speed", "Trophy"]
-        for col, header in enumerate(headers):
-            cell_x = table_x + col * cell_width
-            draw_text_with_shadow(screen, header, small_font, YELLOW, (cell_x + 5, table_y - 20))
-            pygame.draw.rect(screen, WHITE, (cell_x, table_y - 30, cell_width, 30), 1)
-
+    # Background, dimming, title and headers never change: they go into the base layer
+    dim_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+    dim_surface.fill((0, 0, 0, 180))
+    base = compose_static_layer(race_backgrounds["results"], [(dim_surface, (0, 0))])
+    draw_text_with_shadow(base, "Tournament Results", font, WHITE, (SCREEN_WIDTH // 2 - 120, 60))
+    headers = ["Racer", "Place", "Points", "Wins", "Avg Speed", "Trophy"]
+    for col, header in enumerate(headers):
+        cell_x = table_x + col * cell_width
+        draw_text_with_shadow(base, header, small_font, YELLOW, (cell_x + 5, table_y - 20))
+        pygame.draw.rect(base, WHITE, (cell_x, table_y - 30, cell_width, 30), 1)
+    renderer = DirtyRectRenderer(screen, base)
+    marquee_surface = get_text_surface(marquee_text, small_font, WHITE)
+    rows_rect = pygame.Rect(table_x, table_y, num_cols * cell_width, max_visible_rows * cell_height)
+    scaled_trophy = get_transformed(trophy_image, (50, 50))
+
+    def draw_rows():
         start_row = scroll_offset // cell_height
         end_row = min(start_row + max_visible_rows, len(sorted_sprotos))
         for row in range(start_row, end_row):
@@ -500,9 +593,8 @@ def show_tournament_results(screen, sprotos, race_backgrounds, trophy_image, is_
                     if border_color:
                         pygame.draw.rect(screen, border_color, (image_x - 3, image_y - 3, 56, 56), 3)
                     screen.blit(sproto.sprite, (image_x, image_y))
-                    name_text = small_font.render(sproto.name, True, WHITE)
                     name_x = image_x + 60
-                    name_y = cell_y + (cell_height - name_text.get_height()) // 2
+                    name_y = cell_y + (cell_height - small_font.size(sproto.name)[1]) // 2
                     draw_text_with_shadow(screen, sproto.name, small_font, WHITE, (name_x, name_y))
                 elif col == 1:
                     # Correct place suffix for tournament results
@@ -530,12 +622,37 @@ def show_tournament_results(screen, sprotos, race_backgrounds, trophy_image, is_
                 elif col == 5 and row == 0:
                     trophy_x = cell_x + (cell_width - 50) // 2
                     trophy_y = cell_y + (cell_height - 50) // 2
-                    scaled_trophy = pygame.transform.scale(trophy_image, (50, 50))
                     screen.blit(scaled_trophy, (trophy_x, trophy_y))
 
-        draw_text_with_shadow(screen, marquee_text, small_font, WHITE, (marquee_x, marquee_y))
-        continue_button.draw(screen)
-        mute_button.draw(screen, is_muted)
-        pygame.display.flip()
+    while running:
+        dt, events = frames.next_frame(animating=True)
+        for event in events:
+            if event.type == pygame.QUIT:
+                pygame.mixer.music.stop()
+                logging.info("Tournament music stopped (quit).")
+                return False, is_muted
+            if continue_button.is_clicked(event):
+                pygame.mixer.music.stop()
+                logging.info("Tournament music stopped (continue).")
+                running = False
+            clicked, is_muted = mute_button.is_clicked(event, is_muted, RACE_MUSIC_PATH)
+            if clicked:
+                pass
+            if event.type == pygame.MOUSEWHEEL:
+                scroll_offset -= event.y * 30
+                scroll_offset = max(0, min(scroll_offset, max(0, table_height - max_visible_rows * cell_height)))
+
+        marquee_x -= 100 * dt
+        if marquee_x < -marquee_width:
+            marquee_x = SCREEN_WIDTH
+
+        widgets = [
+            ("rows", rows_rect, scroll_offset, draw_rows),
+            ("marquee", marquee_surface.get_rect(topleft=(int(marquee_x), marquee_y)), None, partial(screen.blit, marquee_surface, (int(marquee_x), marquee_y))),
+            ("continue", continue_button.rect, continue_button.rect.collidepoint(pygame.mouse.get_pos()), partial(continue_button.draw, screen)),
+            ("mute", mute_button.rect, (mute_button.rect.collidepoint(pygame.mouse.get_pos()), is_muted), partial(mute_button.draw, screen, is_muted)),
+        ]
+        renderer.render(widgets)
+        frames.presented()
 
     return True, is_muted
\ No newline at end of file
@@ -33,6 +33,11 @@ SELECTION_MUSIC_PATH = os.path.join(BASE_DIR, "Music", "character.mp3")
 RACE_MUSIC_PATH = os.path.join(BASE_DIR, "Music", "ocean.mp3")
 TROPHY_PATH = os.path.join(BASE_DIR, "Racers", "trophy.png")
 LOG_PATH = os.path.join(BASE_DIR, "sproto_race.log")
+FIGHT_LOG_PATH = os.path.join(BASE_DIR, "sproto_fight.log")
+SPRITE_CACHE_DIR = os.path.join(BASE_DIR, ".sprite_cache")  # Derived assets, safe to delete
+BG_PACK_PATH = os.path.join(SPRITE_CACHE_DIR, "backgrounds.pack")
+ASSET_INDEX_PATH = os.path.join(SPRITE_CACHE_DIR, "asset_index.json")  # Logical asset IDs -> content hashes
+TELEMETRY_DIR = os.path.join(BASE_DIR, "telemetry")  # Per-tick race recordings
 
 # Screen settings
 SCREEN_WIDTH = 1200
@@ -53,31 +58,103 @@ GOLD = (255, 215, 0)
 SILVER = (192, 192, 192)
 BRONZE = (205, 127, 50)
 
+# Font registry: SysFont lookups are slow and allocate, so every font is built once and shared.
+# Shared fonts must not be restyled (set_bold etc.), ask for a bold/italic variant instead.
+_fonts = {}
+
+def get_font(name, size, bold=False, italic=False):
+    key = (name, size, bold, italic)
+    if key not in _fonts:
+        _fonts[key] = pygame.font.SysFont(name, size, bold=bold, italic=italic)
+    return _fonts[key]
+
+def get_default_font(size):
+    key = (None, size, False, False)
+    if key not in _fonts:
+        _fonts[key] = pygame.font.Font(None, size)
+    return _fonts[key]
+
 # Fonts
-font = pygame.font.SysFont("arial", 30)
-small_font = pygame.font.SysFont("arial", 20)
-large_font = pygame.font.SysFont("arial", 40)
-place_font = pygame.font.SysFont("arial", 24)
-selection_font = pygame.font.SysFont("arial", 24)
-race_button_font = pygame.font.SysFont("arial", 18)
+font = get_font("arial", 30)
+small_font = get_font("arial", 20)
+large_font = get_font("arial", 40)
+place_font = get_font("arial", 24)
+selection_font = get_font("arial", 24)
+race_button_font = get_font("arial", 18)
 
-# Sproto names and image filenames
-sproto_names = [
-    "Yannix", "Yo-Yo", "GB", "FHD", "More Light",
-    "Vamp", "Jahon", "ReD", "VMU", "Alpha",
-    "Dumpstar", "KatieCans", "Turbo", "HOBA", "Speed Demon",
-    "Rumble Pak", "Leviosa", "Obama", "Vince", "BPS",
-    "Apache", "OG OBAMA", "Oggo", "BigSwole", "GPM", "YXJI", "Snoo"
-]
-image_filenames = [f"racer{i}.jpg" for i in range(1, 14)] + [
-    "racer14.png", "racer15.jpg", "racer16.jpg", "racer17.jpg",
-    "racer18.jpg", "racer19.jpg", "racer20.jpg",
-    "racer21.png", "racer22.png", "racer23.jpg", "racer24.jpg", "racer25.jpg", "racer26.jpg", "racer27.jpg"
+# Sproto names and their image files in SPROTO_IMAGE_PATH, in roster order
+SPROTO_ROSTER = [
+    ("Yannix", "racer1.jpg"),
+    ("Yo-Yo", "racer2.jpg"),
+    ("GB", "racer3.jpg"),
+    ("FHD", "racer4.jpg"),
+    ("More Light", "racer5.jpg"),
+    ("Vamp", "racer6.jpg"),
+    ("Jahon", "racer7.jpg"),
+    ("ReD", "racer8.jpg"),
+    ("VMU", "racer9.jpg"),
+    ("Alpha", "racer10.jpg"),
+    ("Dumpstar", "racer11.jpg"),
+    ("KatieCans", "racer12.jpg"),
+    ("Turbo", "racer13.jpg"),
+    ("HOBA", "racer14.png"),
+    ("Speed Demon", "racer15.jpg"),
+    ("Rumble Pak", "racer16.jpg"),
+    ("Leviosa", "racer17.jpg"),
+    ("Obama", "racer18.jpg"),
+    ("Vince", "racer19.jpg"),
+    ("BPS", "racer20.jpg"),
+    ("Apache", "racer21.png"),
+    ("OG OBAMA", "racer22.png"),
+    ("Oggo", "racer23.jpg"),
+    ("BigSwole", "racer24.jpg"),
+    ("GPM", "racer25.jpg"),
+    ("YXJI", "racer26.jpg"),
+    ("Snoo", "racer27.jpg"),
 ]
+sproto_names = [name for name, _ in SPROTO_ROSTER]
+image_filenames = [filename for _, filename in SPROTO_ROSTER]
 
 # Game settings
 RACE_DISTANCE = 1500
 RACE_DURATION = 60
 MAX_SPROTOS = 5
+SPRITE_SIZE = 50  # Racer sprite size used on every screen
+SPRITE_CACHE_SIZES = (50, 23, 100)  # Prebaked variants: race/selection, all-characters lanes, cheese mode
 SPEED_RANGE = (80, 120)
+SPEED_REROLL_CHANCE = 0.01  # Chance a racer re-rolls its speed each 1/60 s of race time
+SIMULATION_DT = 1 / 60  # Fixed physics step for live and headless races (raise it to trade accuracy for CPU)
+MAX_PHYSICS_STEPS_PER_FRAME = 8  # Cap on catch-up steps after a slow frame
+ODDS_NUM_RACES = 50000  # Races simulated per lineup for the live odds panel
+ODDS_PROCESSES = None  # Worker processes for odds simulation (None = one per core)
+ODDS_SHARD_RACES = 5000  # Races per odds worker task; fixed so seeded odds match on any machine
+BATTLE_PROCESSES = None  # Worker processes for headless Pocket Sprotos batches (None = one per core)
+SHOW_FIGHT_ODDS = True  # Exact win chances under the Pocket Sprotos status boxes
+POCKET_NPC_POLICY = "npc"  # Pocket Sprotos opponent: "npc" (classic), "optimal" (solved table), "aggressive", "attack", "random"
+MEGA_RACE_ENTRANTS = 10000  # Field size for Mega Race (racer images are reused with numbered names)
+MEGA_RACE_LANE_HEIGHT = 24
+MEGA_RACE_RESULTS_ROWS = 100  # Finishers listed on the Mega Race results screen
+MEGA_LEADER_POOL = 64  # Furthest runners the Mega Race leaderboard ranks between full re-sorts
+ASSET_LOADER_THREADS = 4  # Threads decoding images in the background
+USE_BG_PACK = True  # Map pre-decoded backgrounds from BG_PACK_PATH instead of inflating the PNGs
+TEXT_CACHE_SIZE = 1024  # Composed text labels kept by draw_text_with_shadow
+TRANSFORM_CACHE_BYTES = 32 * 1024 * 1024  # Pixel memory kept by the shared scaled/rotated sprite cache
+TRANSFORM_ANGLE_STEP = 1  # Rotation angles are snapped to this many degrees before caching
+SPIN_FRAME_STEP = 6  # Degrees between the pre-rendered frames of the Sonic Dash spin
+FRAME_RATE = 60  # Frame cap for animated screens
+ANIMATION_FRAME_RATE = 30  # Results screens only animate the marquee, which doesn't need 60 FPS
+IDLE_WAKE_MS = 1000  # Longest a static screen sleeps waiting for input
+DIRTY_RECT_RENDERING = True  # Menus and results screens push only changed regions to the display
+LOG_LEVEL = "DEBUG"  # Root log level
+LOG_LEVELS = {"selection.roster": "WARNING"}  # Per-subsystem overrides; set to "INFO" to log them
+LOG_QUEUE_SIZE = 10000  # Records waiting for the log writer thread before new ones are dropped
+LOG_BATCH_SIZE = 256  # Records written per flush
+LOG_MAX_BYTES = 1024 * 1024  # Log files rotate past this size; old ones are gzipped
+LOG_BACKUP_COUNT = 3
+RECORD_TELEMETRY = True  # Record every race tick to TELEMETRY_DIR
+TELEMETRY_KEEP_RACES = 20  # Oldest recordings are deleted past this many
+TELEMETRY_BUFFER_TICKS = 256  # Ticks buffered in memory between appends to the file
+REPLAY_SPEEDS = (0.25, 0.5, 1, 2, 4, 8, 16)  # Playback rates offered by race replays
+REPLAY_SEEK_STEP = 1.0  # Seconds skipped by the arrow keys during a replay
+RANDOM_SEED = None  # Fixed seed for reproducible races and fights (None = fresh each launch)
 MARQUEE_TEXT = "Sprotos go fast. Race to the finish!"
\ No newline at end of file
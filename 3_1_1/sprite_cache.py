@@ -0,0 +1,130 @@
+import logging
+import os
+from collections import OrderedDict
+import pygame
+from settings import *
+from surface_format import convert_for_display
+
+# On-disk cache of pre-scaled racer sprites. Entries are named after the source file's
+# content hash from the asset registry, so unchanged files are never re-decoded and
+# edited files get a new hash and are rebaked. Decoding and baking touch no display, so
+# they run on the asset loader's threads; only the conversion in finish_sprite() has to
+# happen on the main thread. Sprites are smoothscaled in Pocket mode, so they are never
+# colorkeyed: opaque ones get convert(), the rest convert_alpha().
+
+# Scaled variants of every loaded sprite, keyed by the base (SPRITE_SIZE) surface
+_variants = {}
+
+def _cache_path(source_hash, size):
+    return os.path.join(SPRITE_CACHE_DIR, f"{source_hash}_{size}.png")
+
+def _bake(file_path, source_hash):
+    # Smaller/larger variants come from the 50x50 sprite, exactly as the game used to scale them.
+    # Blitting onto a 32-bit alpha surface stands in for convert_alpha(), which needs the display.
+    decoded = pygame.image.load(file_path)
+    image = pygame.Surface(decoded.get_size(), pygame.SRCALPHA, 32)
+    image.blit(decoded, (0, 0))
+    base = pygame.transform.scale(image, (SPRITE_SIZE, SPRITE_SIZE))
+    variants = {size: base if size == SPRITE_SIZE else pygame.transform.scale(base, (size, size)) for size in SPRITE_CACHE_SIZES}
+    try:
+        os.makedirs(SPRITE_CACHE_DIR, exist_ok=True)
+        for size, surface in variants.items():
+            pygame.image.save(surface, _cache_path(source_hash, size))
+    except (OSError, pygame.error) as e:
+        logging.warning(f"Could not write sprite cache for '{file_path}': {e}")
+    return variants
+
+def _load_cached(source_hash):
+    variants = {}
+    for size in SPRITE_CACHE_SIZES:
+        try:
+            variants[size] = pygame.image.load(_cache_path(source_hash, size))
+        except (OSError, pygame.error):
+            return None
+    return variants
+
+def decode_sprite(file_path, source_hash):
+    # Thread-safe half: the unconverted variants, from the cache or freshly baked.
+    # Raises pygame.error/OSError like pygame.image.load would.
+    variants = _load_cached(source_hash)
+    if variants is None:
+        logging.info(f"Baking sprite cache for '{os.path.basename(file_path)}'")
+        variants = _bake(file_path, source_hash)
+    return variants
+
+def finish_sprite(variants):
+    # Main-thread half: converts the variants for the display and returns the SPRITE_SIZE sprite
+    variants = {size: convert_for_display(surface, colorkey=False) for size, surface in variants.items()}
+    _variants[variants[SPRITE_SIZE]] = variants
+    return variants[SPRITE_SIZE]
+
+def get_sprite_variant(image, size):
+    # Prebaked variant for sprites that came through the cache, the shared transform cache otherwise
+    variants = _variants.get(image)
+    if variants is not None and size in variants:
+        return variants[size]
+    return transform_cache.get(image, (size, size))
+
+def _surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+class TransformCache:
+    # Scaled and rotated copies of sprites, keyed by (source surface, size, angle, filter).
+    # Angles are snapped to TRANSFORM_ANGLE_STEP so animations reuse frames. Least recently
+    # used entries are dropped once the cached pixels pass max_bytes.
+    def __init__(self, max_bytes=TRANSFORM_CACHE_BYTES, angle_step=TRANSFORM_ANGLE_STEP):
+        self.max_bytes = max_bytes
+        self.angle_step = angle_step
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, image, size=None, angle=0, smooth=False):
+        size = image.get_size() if size is None else (int(size[0]), int(size[1]))
+        angle = round(angle / self.angle_step) * self.angle_step % 360
+        if size == image.get_size() and angle == 0:
+            return image
+        key = (image, size, angle, smooth)
+        surface = self._entries.get(key)
+        if surface is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = image
+        if size != image.get_size():
+            surface = (pygame.transform.smoothscale if smooth else pygame.transform.scale)(surface, size)
+        if angle:
+            surface = pygame.transform.rotate(surface, angle)
+        self._entries[key] = surface
+        self.bytes += _surface_bytes(surface)
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= _surface_bytes(evicted)
+        return surface
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+transform_cache = TransformCache()
+
+def get_transformed(image, size=None, angle=0, smooth=False):
+    return transform_cache.get(image, size, angle, smooth)
+
+class RotationFrames:
+    # A sprite rotated through a full turn in fixed steps, rendered once up front. Spinning
+    # then picks the nearest frame: one blit per frame and no new surfaces mid-animation.
+    def __init__(self, image, step=SPIN_FRAME_STEP):
+        self.step = step
+        self.frames = [get_transformed(image, angle=i * step) for i in range(round(360 / step))]
+        # Top-left offsets that keep each frame centred where the unrotated sprite was
+        self.offsets = [(-(frame.get_width() // 2), -(frame.get_height() // 2)) for frame in self.frames]
+
+    def index(self, angle):
+        return round(angle / self.step) % len(self.frames)
+
+    def blit(self, screen, center, angle):
+        i = self.index(angle)
+        screen.blit(self.frames[i], (center[0] + self.offsets[i][0], center[1] + self.offsets[i][1]))
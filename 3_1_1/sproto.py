@@ -1,30 +1,31 @@
 import pygame
 import random
 from settings import *
+from track_geometry import get_curve_position
+from sprite_cache import get_sprite_variant
 
 def get_track_position(position, lane, race_distance, lane_height=100):
     track_y = 50 if lane_height < 100 else SCREEN_HEIGHT // 4
     sprite_width = 25 if lane_height < 100 else 50
-    if lane_height == 100:  # Single/tournament: curved path
-        t = (position / race_distance)  # Normalized position [0, 1]
-        start_x, start_y = 0, track_y + lane * lane_height + lane_height // 2
-        end_x, end_y = SCREEN_WIDTH - sprite_width, track_y + lane * lane_height + lane_height // 2
-        control1_x, control1_y = SCREEN_WIDTH // 4, track_y + lane * lane_height + lane_height // 2 - 50
-        control2_x, control2_y = 3 * SCREEN_WIDTH // 4, track_y + lane * lane_height + lane_height // 2 + 50
-        x = (1-t)**3 * start_x + 3*(1-t)**2*t * control1_x + 3*(1-t)*t**2 * control2_x + t**3 * end_x
-        y = (1-t)**3 * start_y + 3*(1-t)**2*t * control1_y + 3*(1-t)*t**2 * control2_y + t**3 * end_y
-    else:  # All-characters: straight path
-        x = (position / race_distance) * (SCREEN_WIDTH - sprite_width)
-        y = track_y + lane * lane_height + lane_height // 2
+    if lane_height == 100:  # Single/tournament: curved path, read from the precomputed lane table
+        return get_curve_position(position / race_distance, track_y + lane * lane_height + lane_height // 2, sprite_width)
+    # All-characters: straight path
+    x = (position / race_distance) * (SCREEN_WIDTH - sprite_width)
+    y = track_y + lane * lane_height + lane_height // 2
     return x, y
 
+def get_reroll_chance(dt):
+    # SPEED_REROLL_CHANCE is defined per 1/60 s, so a coarser step re-rolls at the same rate per second
+    return 1 - (1 - SPEED_REROLL_CHANCE) ** (dt * 60)
+
 class Sproto:
     def __init__(self, name, position, lane, image):
         self.name = name
         self.position = position
+        self.previous_position = position  # Position before the last physics step, for interpolation
         self.lane = lane
         self.sprite = image
-        self.small_sprite = pygame.transform.scale(image, (23, 23))  # Cache for all-characters mode
+        self.small_sprite = get_sprite_variant(image, 23)  # Prebaked for all-characters mode
         self.current_speed = 0
         self.min_speed = 0
         self.max_speed = 0
@@ -36,14 +37,15 @@ class Sproto:
         self.tournament_wins = 0
         self.tournament_points = 0
 
-    def set_speed(self, min_speed, max_speed):
+    def set_speed(self, min_speed, max_speed, rng=random):
         self.min_speed = min_speed
         self.max_speed = max_speed
-        self.current_speed = random.uniform(min_speed, max_speed)
+        self.current_speed = rng.uniform(min_speed, max_speed)
 
-    def reset(self, race_distance):
+    def reset(self, race_distance, rng=random):
         self.position = 0
-        self.current_speed = random.uniform(self.min_speed, self.max_speed)
+        self.previous_position = 0
+        self.current_speed = rng.uniform(self.min_speed, self.max_speed)
         self.finished = False
         self.start_time = 0
         self.finish_time = 0
@@ -54,7 +56,8 @@ class Sproto:
         self.tournament_wins = 0
         self.tournament_points = 0
 
-    def run(self, race_distance, dt, finishers, time_elapsed):
+    def run(self, race_distance, dt, finishers, time_elapsed, rng=random):
+        self.previous_position = self.position
         if not self.finished:
             if self.start_time == 0:
                 self.start_time = time_elapsed
@@ -66,8 +69,13 @@ class Sproto:
                 if self not in finishers:
                     self.finish_place = len(finishers) + 1
                     finishers.append(self)
-            if random.random() < 0.01:
-                self.current_speed = random.uniform(self.min_speed, self.max_speed)
+            if rng.random() < get_reroll_chance(dt):
+                self.current_speed = rng.uniform(self.min_speed, self.max_speed)
+
+    def get_interpolated_position(self, alpha):
+        if self.finished:
+            return self.position
+        return self.previous_position + (self.position - self.previous_position) * alpha
 
     def get_average_speed(self):
         if self.finish_time > self.start_time:
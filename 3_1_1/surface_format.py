@@ -0,0 +1,58 @@
+import numpy as np
+import pygame
+from settings import *
+
+# Picks the cheapest display format for a decoded image. Most PNGs here carry an alpha
+# channel that is 255 everywhere, and an opaque surface blits as a plain copy instead of a
+# per-pixel blend. Images whose alpha is only ever fully on or off become RLE colorkeyed.
+COLORKEY_CANDIDATES = [(255, 0, 255), (0, 255, 255), (255, 255, 0), (1, 2, 3)]
+
+def alpha_usage(image):
+    # "opaque", "binary" (every pixel fully visible or fully clear) or "blended"
+    if not image.get_flags() & pygame.SRCALPHA:
+        return "opaque"
+    alpha = pygame.surfarray.pixels_alpha(image)
+    try:
+        if alpha.min() == 255:
+            return "opaque"
+        if np.all((alpha == 0) | (alpha == 255)):
+            return "binary"
+        return "blended"
+    finally:
+        del alpha  # Releases the surface lock
+
+def _to_colorkey(image):
+    # Opaque copy with the clear pixels painted in a color the image doesn't use, or None
+    surface = image.convert()
+    alpha = pygame.surfarray.array_alpha(image)
+    rgb = pygame.surfarray.pixels3d(surface)
+    try:
+        visible = rgb[alpha == 255]
+        for key in COLORKEY_CANDIDATES:
+            if not np.all(visible == key, axis=-1).any():
+                rgb[alpha == 0] = key
+                break
+        else:
+            return None
+    finally:
+        del rgb
+    surface.set_colorkey(key, pygame.RLEACCEL)
+    return surface
+
+def convert_for_display(image, colorkey=True):
+    # Pass colorkey=False for images that get smoothscaled later: filtering a colorkeyed
+    # surface smears the key color into the edges
+    if not image.get_flags() & pygame.SRCALPHA:
+        key = image.get_colorkey()
+        surface = image.convert()
+        if key is not None:
+            surface.set_colorkey(key, pygame.RLEACCEL)
+        return surface
+    usage = alpha_usage(image)
+    if usage == "opaque":
+        return image.convert()
+    if usage == "binary" and colorkey:
+        surface = _to_colorkey(image)
+        if surface is not None:
+            return surface
+    return image.convert_alpha()
@@ -0,0 +1,123 @@
+import logging
+import os
+import struct
+import time
+import numpy as np
+from settings import *
+
+# Per-tick race telemetry. The file is a small header, the racer names, then one row of
+# float32 per simulation tick: [time, positions..., speeds..., finished...]. Rows are
+# buffered and appended in blocks while the race runs; RaceTelemetry maps the file back
+# with np.memmap, so reading a race costs no parsing at all.
+TELEMETRY_MAGIC = b"SPTL"
+TELEMETRY_VERSION = 1
+HEADER = struct.Struct("<4sHHdd")  # magic, version, racer count, tick length, race distance
+NAME_BYTES = 32
+
+def _row_width(count):
+    return 1 + 3 * count
+
+class TelemetryRecorder:
+    def __init__(self, path, names, race_distance, dt=SIMULATION_DT, buffer_ticks=TELEMETRY_BUFFER_TICKS):
+        self.path = path
+        self.count = len(names)
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(TELEMETRY_MAGIC, TELEMETRY_VERSION, self.count, dt, race_distance))
+        for name in names:
+            self._file.write(name.encode("utf-8")[:NAME_BYTES].ljust(NAME_BYTES, b"\0"))
+        self._buffer = np.zeros((buffer_ticks, _row_width(self.count)), dtype=np.float32)
+        self._used = 0
+        self.ticks = 0
+
+    def record(self, time_elapsed, sprotos):
+        row = self._buffer[self._used]
+        row[0] = time_elapsed
+        count = self.count
+        for i, sproto in enumerate(sprotos):
+            row[1 + i] = sproto.position
+            row[1 + count + i] = sproto.current_speed
+            row[1 + 2 * count + i] = sproto.finished
+        self._used += 1
+        self.ticks += 1
+        if self._used == len(self._buffer):
+            self._flush()
+
+    def _flush(self):
+        if self._used and self._file is not None:
+            try:
+                self._file.write(self._buffer[:self._used])
+            except OSError as e:
+                logging.warning(f"Stopped writing race telemetry to '{self.path}': {e}")
+                self._file.close()
+                self._file = None
+        self._used = 0
+
+    def close(self):
+        if self._file is None:
+            return
+        self._flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logging.info(f"Race telemetry: {self.ticks} ticks written to '{self.path}'")
+
+def _prune(folder, keep):
+    races = sorted(name for name in os.listdir(folder) if name.endswith(".sptl"))
+    for name in races[:max(0, len(races) - keep)]:
+        try:
+            os.remove(os.path.join(folder, name))
+        except OSError:
+            pass
+
+def start_telemetry(sprotos, race_distance, folder=TELEMETRY_DIR):
+    # A recorder holding the race's starting positions, or None if recording is off or fails
+    if not RECORD_TELEMETRY:
+        return None
+    try:
+        os.makedirs(folder, exist_ok=True)
+        _prune(folder, TELEMETRY_KEEP_RACES - 1)
+        path = os.path.join(folder, f"race-{time.time_ns()}.sptl")
+        recorder = TelemetryRecorder(path, [sproto.name for sproto in sprotos], race_distance)
+    except OSError as e:
+        logging.warning(f"Race telemetry disabled: {e}")
+        return None
+    recorder.record(0.0, sprotos)
+    return recorder
+
+class RaceTelemetry:
+    # Read side: every column is a view into the memory-mapped file
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            magic, version, count, self.dt, self.race_distance = HEADER.unpack(header)
+            if magic != TELEMETRY_MAGIC or version != TELEMETRY_VERSION:
+                raise ValueError(f"'{path}' is not a race telemetry file")
+            self.names = [f.read(NAME_BYTES).rstrip(b"\0").decode("utf-8", "replace") for _ in range(count)]
+        self.path = path
+        self.count = count
+        offset = HEADER.size + NAME_BYTES * count
+        width = _row_width(count)
+        # A race cut short may end in a partial row; it is ignored
+        rows = (os.path.getsize(path) - offset) // (4 * width)
+        if rows:
+            self.ticks = np.memmap(path, dtype=np.float32, mode="r", offset=offset, shape=(rows, width))
+        else:
+            self.ticks = np.zeros((0, width), dtype=np.float32)
+        self.times = self.ticks[:, 0]
+        self.positions = self.ticks[:, 1:1 + count]
+        self.speeds = self.ticks[:, 1 + count:1 + 2 * count]
+        self.finished = self.ticks[:, 1 + 2 * count:]  # 1.0 once a racer has crossed the line
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def locate(self, t):
+        # (row, fraction) such that time t lies between rows row and row + 1. Every row is a
+        # full snapshot, so the time column is the keyframe index and a seek is a binary search.
+        if len(self) < 2:
+            return 0, 0.0
+        row = int(np.searchsorted(self.times, t, side="right")) - 1
+        row = min(max(row, 0), len(self) - 2)
+        span = float(self.times[row + 1] - self.times[row])
+        fraction = (t - float(self.times[row])) / span if span > 0 else 1.0
+        return row, min(max(fraction, 0.0), 1.0)
@@ -0,0 +1,49 @@
+from functools import lru_cache
+import pygame
+from settings import *
+
+# Samples per lane curve in the position lookup table
+TRACK_SAMPLES = 256
+# Lane curves bulge ~15 px past their lane, so the cached track surface gets a margin
+TRACK_PADDING = 50
+CURVE_BEND = 50
+
+def bezier_point(t, start, control1, control2, end):
+    x = (1-t)**3 * start[0] + 3*(1-t)**2*t * control1[0] + 3*(1-t)*t**2 * control2[0] + t**3 * end[0]
+    y = (1-t)**3 * start[1] + 3*(1-t)**2*t * control1[1] + 3*(1-t)*t**2 * control2[1] + t**3 * end[1]
+    return x, y
+
+@lru_cache(maxsize=None)
+def get_curve_table(sprite_width):
+    # Every lane follows the same curve shifted down, so one table of (x, y offset) serves them all
+    start = (0, 0)
+    control1 = (SCREEN_WIDTH // 4, -CURVE_BEND)
+    control2 = (3 * SCREEN_WIDTH // 4, CURVE_BEND)
+    end = (SCREEN_WIDTH - sprite_width, 0)
+    points = [bezier_point(i / TRACK_SAMPLES, start, control1, control2, end) for i in range(TRACK_SAMPLES + 1)]
+    return [p[0] for p in points], [p[1] for p in points]
+
+def get_curve_position(t, lane_center_y, sprite_width=50):
+    xs, offsets = get_curve_table(sprite_width)
+    scaled = min(max(t, 0.0), 1.0) * TRACK_SAMPLES
+    i = min(int(scaled), TRACK_SAMPLES - 1)
+    frac = scaled - i
+    x = xs[i] + (xs[i + 1] - xs[i]) * frac
+    y = offsets[i] + (offsets[i + 1] - offsets[i]) * frac
+    return x, lane_center_y + y
+
+@lru_cache(maxsize=None)
+def get_lane_line_points(num_lanes, lane_height=100):
+    # Yellow lane lines, relative to the top of the track
+    lines = []
+    for i in range(num_lanes):
+        start = (0, i * lane_height)
+        end = (SCREEN_WIDTH, i * lane_height)
+        control1 = (SCREEN_WIDTH // 4, i * lane_height - CURVE_BEND)
+        control2 = (3 * SCREEN_WIDTH // 4, i * lane_height + CURVE_BEND)
+        lines.append([bezier_point(t / 100, start, control1, control2, end) for t in range(0, 101, 2)])
+    return lines
+
+def draw_lane_lines(surface, num_lanes, lane_height=100, offset_y=0):
+    for points in get_lane_line_points(num_lanes, lane_height):
+        pygame.draw.lines(surface, YELLOW, False, [(x, y + offset_y) for x, y in points], 2)  # Curved lines are yellow and 2px thick
@@ -1,26 +1,77 @@
 import pygame
 import logging
+from collections import OrderedDict
+import numpy as np
 from settings import *
+from track_geometry import TRACK_PADDING, draw_lane_lines
+
+# Composed text surfaces keyed by (font, text, color, stroke), least recently used first
+_text_cache = OrderedDict()
 
 def cache_track_surface(race_distance, num_lanes, lane_height=100):
-    track_surface = pygame.Surface((SCREEN_WIDTH, num_lanes * lane_height), pygame.SRCALPHA)
+    # Padded so the curved lane lines can bulge past the first lane; blit at track_y - TRACK_PADDING
+    track_surface = pygame.Surface((SCREEN_WIDTH, num_lanes * lane_height + 2 * TRACK_PADDING), pygame.SRCALPHA)
+    if lane_height == 100:  # Single/tournament: curved lanes are drawn once here instead of every frame
+        draw_lane_lines(track_surface, num_lanes, lane_height, offset_y=TRACK_PADDING)
     return track_surface
 
-def draw_text_with_shadow(screen, text, font, color, pos, stroke=False):
-    text_surface = font.render(text, True, color)
-    shadow_surface = font.render(text, True, BLACK)
-    
+def compose_static_layer(background, overlays=()):
+    # Bakes a background and the overlays drawn over it every frame into one opaque surface,
+    # so a frame starts with a single plain blit instead of full-screen alpha blending
+    layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    if background is not None:
+        layer.blit(background, (0, 0))
+    else:
+        layer.fill(BLUE)
+    for surface, pos in overlays:
+        layer.blit(surface, pos)
+    return layer
+
+def _compose_text(text, font, color, stroke):
+    # Shadow (and stroke) layers are the glyph coverage in black, so the whole stack reduces to
+    # straight-alpha "over" maths on one mask. Blitting onto a transparent SRCALPHA surface
+    # instead would darken the antialiased edges.
+    glyphs = font.render(text, True, color)
+    width, height = glyphs.get_size()
+    coverage = np.frombuffer(pygame.image.tobytes(glyphs, "RGBA"), dtype=np.uint8).reshape(height, width, 4)[:, :, 3] * np.float32(1 / 255)
+    margin = 1 if stroke else 0
+    size = (width + 2 + margin, height + 2 + margin)
+    shadow_offsets = [(margin + 2, margin + 2)]
     if stroke:
-        stroke_positions = [
-            (pos[0] - 1, pos[1] - 1), (pos[0], pos[1] - 1), (pos[0] + 1, pos[1] - 1),
-            (pos[0] - 1, pos[1]),                     (pos[0] + 1, pos[1]),
-            (pos[0] - 1, pos[1] + 1), (pos[0], pos[1] + 1), (pos[0] + 1, pos[1] + 1)
-        ]
-        for stroke_pos in stroke_positions:
-            screen.blit(font.render(text, True, BLACK), stroke_pos)
-    
-    screen.blit(shadow_surface, (pos[0] + 2, pos[1] + 2))
-    screen.blit(text_surface, pos)
+        shadow_offsets += [(margin + dx, margin + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+    uncovered = np.ones((size[1], size[0]), dtype=np.float32)
+    remaining = 1 - coverage
+    for x, y in shadow_offsets:
+        uncovered[y:y + height, x:x + width] *= remaining
+    text_alpha = np.zeros_like(uncovered)
+    text_alpha[margin:margin + height, margin:margin + width] = coverage
+    alpha = text_alpha + (1 - uncovered) * (1 - text_alpha)
+    text_share = np.divide(text_alpha, alpha, out=np.zeros_like(alpha), where=alpha > 0)
+
+    pixels = np.empty((size[1], size[0], 4), dtype=np.uint8)
+    for channel, value in enumerate(tuple(color)[:3]):
+        pixels[:, :, channel] = text_share * value + 0.5
+    pixels[:, :, 3] = alpha * 255 + 0.5
+    return pygame.image.frombytes(pixels.tobytes(), size, "RGBA")
+
+def get_text_surface(text, font, color, stroke=False):
+    key = (font, text, tuple(color), stroke)
+    surface = _text_cache.get(key)
+    if surface is None:
+        surface = _compose_text(text, font, color, stroke)
+        _text_cache[key] = surface
+        if len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+    else:
+        _text_cache.move_to_end(key)
+    return surface
+
+def draw_text_with_shadow(screen, text, font, color, pos, stroke=False):
+    if not text:
+        return
+    # One blit of the cached, pre-composed label instead of 2 (or 10 with stroke) font renders
+    margin = 1 if stroke else 0
+    screen.blit(get_text_surface(text, font, color, stroke), (pos[0] - margin, pos[1] - margin))
 
 class Button:
     def __init__(self, text, x, y, width, height, color, hover_color=BLUE, custom_font=None, text_color=WHITE, hover_text_color=YELLOW):
@@ -28,7 +79,7 @@ class Button:
         self.rect = pygame.Rect(x, y, width, height)
         self.color = color
         self.hover_color = hover_color
-        self.font = custom_font if custom_font is not None else pygame.font.SysFont("arial", 24)
+        self.font = custom_font if custom_font is not None else get_font("arial", 24)
         self.text_color = text_color
         self.hover_text_color = hover_text_color
 
@@ -57,7 +108,7 @@ class MuteButton:
         self.rect = pygame.Rect(x, y, width, height)
         self.color = color
         self.hover_color = hover_color
-        self.font = pygame.font.SysFont("arial", 16)
+        self.font = get_font("arial", 16)
 
     def draw(self, screen, is_muted):
         mouse_pos = pygame.mouse.get_pos()
@@ -94,4 +145,63 @@ class MuteButton:
                         pygame.mixer.music.unpause()
                         logging.info("Music unmuted and playing.")
                 return True, is_muted
-        return False, is_muted
\ No newline at end of file
+        return False, is_muted
+
+def _merge_rects(rects):
+    # Overlapping dirty areas become one, so nothing under them is drawn twice
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        i = 0
+        while i < len(merged):
+            if rect.colliderect(merged[i]):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
+
+class DirtyRectRenderer:
+    # Composites a screen from a static base layer plus widgets, given back to front as
+    # (key, rect, state, draw). After the first full frame only widgets whose rect or state
+    # changed are redrawn: the base is restored under them, every widget overlapping the
+    # area is redrawn clipped to it, and just those rects go to pygame.display.update().
+    def __init__(self, screen, base, enabled=DIRTY_RECT_RENDERING):
+        self.screen = screen
+        self.base = base
+        self.enabled = enabled
+        self._last = {}
+        self._full = True
+
+    def invalidate(self):
+        self._full = True
+
+    def render(self, widgets):
+        widgets = [(key, pygame.Rect(rect), state, draw) for key, rect, state, draw in widgets]
+        if self._full or not self.enabled:
+            self.screen.blit(self.base, (0, 0))
+            for _, _, _, draw in widgets:
+                draw()
+            pygame.display.flip()
+        else:
+            dirty = []
+            for key, rect, state, _ in widgets:
+                previous = self._last.pop(key, None)
+                if previous is None:
+                    dirty.append(rect)
+                elif previous != (rect, state):
+                    dirty.extend([rect, previous[0]])
+            dirty.extend(rect for rect, _ in self._last.values())  # Widgets that went away
+            dirty = _merge_rects([rect.clip(self.screen.get_rect()) for rect in dirty if rect.width and rect.height])
+            for area in dirty:
+                self.screen.set_clip(area)
+                self.screen.blit(self.base, area, area)
+                for _, rect, _, draw in widgets:
+                    if rect.colliderect(area):
+                        draw()
+            self.screen.set_clip(None)
+            if dirty:
+                pygame.display.update(dirty)
+        self._last = {key: (rect, state) for key, rect, state, _ in widgets}
+        self._full = False